@@ -0,0 +1,199 @@
+"""
+Throughput and latency of the auth endpoints, driven in-process
+through `main.app` against a throwaway SQLite database.
+
+    python -m benchmarks.bench_auth --concurrency 16 --requests 400
+    python -m benchmarks.bench_auth --compare benchmarks/results/<older>.json
+
+Every run is stored as JSON (with the git commit it ran on) in
+`benchmarks/results/`, so runs on different commits can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.common import (
+    ROOT_DIR,
+    bench_app,
+    latency_summary,
+    login,
+    register_user,
+)
+
+RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+PASSWORDS = ("bench-password-a", "bench-password-b")
+ENDPOINTS = ("register", "login", "refresh", "users_me", "change_password")
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, username: str) -> None:
+        self.client = client
+        self.username = username
+        self.password_idx = 0
+        self.registered = 0
+
+    @property
+    def password(self) -> str:
+        return PASSWORDS[self.password_idx]
+
+    async def register(self) -> httpx.Response:
+        # every call registers a new user
+        self.registered += 1
+        return await self.client.post(
+            "/api/v1/auth/register",
+            data={
+                "username": f"{self.username}_r{self.registered}",
+                "password": self.password,
+                "email": f"{self.username}_r{self.registered}@example.com",
+            },
+        )
+
+    async def login(self) -> httpx.Response:
+        return await login(self.client, self.username, self.password)
+
+    async def refresh(self) -> httpx.Response:
+        return await self.client.post("/api/v1/auth/refresh")
+
+    async def users_me(self) -> httpx.Response:
+        return await self.client.get("/api/v1/auth/users/me")
+
+    async def change_password(self) -> httpx.Response:
+        new_idx = 1 - self.password_idx
+        response = await self.client.patch(
+            "/api/v1/auth/change_password",
+            json={
+                "current_password": self.password,
+                "new_password": PASSWORDS[new_idx],
+            },
+        )
+        if response.status_code == 200:
+            self.password_idx = new_idx
+        return response
+
+
+async def run_endpoint(
+    users: list[VirtualUser],
+    operation: Callable[[VirtualUser], Awaitable[httpx.Response]],
+    requests: int,
+) -> dict:
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    per_user = max(1, requests // len(users))
+
+    async def drive(user: VirtualUser) -> None:
+        for _ in range(per_user):
+            start = time.perf_counter()
+            response = await operation(user)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                code = str(response.status_code)
+                errors[code] = errors.get(code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(user) for user in users))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "errors": errors,
+        "req_per_s": round(len(latencies) / elapsed, 2),
+        **latency_summary(latencies),
+    }
+
+
+async def run_suite(concurrency: int, requests: int, endpoints: list[str]) -> dict:
+    results = {}
+    async with bench_app() as (_, make_client):
+        clients = [make_client() for _ in range(concurrency)]
+        users = [
+            VirtualUser(client, f"bench_user_{idx}")
+            for idx, client in enumerate(clients)
+        ]
+        try:
+            for user in users:
+                await register_user(user.client, user.username, user.password)
+                (await user.login()).raise_for_status()
+
+            for endpoint in endpoints:
+                operation = getattr(VirtualUser, endpoint)
+                results[endpoint] = await run_endpoint(users, operation, requests)
+        finally:
+            for client in clients:
+                await client.aclose()
+
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(current: dict, previous: dict) -> None:
+    print(f"\n{'endpoint':<16} {'req/s':>18} {'p99 ms':>22}")
+    for endpoint, stats in current["endpoints"].items():
+        old = previous["endpoints"].get(endpoint)
+        if old is None:
+            continue
+        print(
+            f"{endpoint:<16} "
+            f"{old['req_per_s']:>8} -> {stats['req_per_s']:<8} "
+            f"{old['p99_ms']:>10} -> {stats['p99_ms']:<10}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="per endpoint")
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        choices=ENDPOINTS,
+        default=list(ENDPOINTS),
+    )
+    parser.add_argument("--output", type=Path, help="results file to write")
+    parser.add_argument("--compare", type=Path, help="earlier results file")
+    args = parser.parse_args()
+
+    run = {
+        "commit": git_commit(),
+        "started_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "requests_per_endpoint": args.requests,
+        "endpoints": await run_suite(args.concurrency, args.requests, args.endpoints),
+    }
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{run['commit'] or 'unknown'}.json"
+    output.write_text(json.dumps(run, indent=2))
+
+    print(json.dumps(run["endpoints"], indent=2))
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        print_comparison(run, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
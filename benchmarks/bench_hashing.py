@@ -0,0 +1,99 @@
+"""
+p99 latency of `/users/me` while concurrent logins are running.
+
+Compares bcrypt running inline on the event loop (the old behaviour)
+with the pooled `PasswordHasher`:
+
+    python -m benchmarks.bench_hashing --logins 8 --duration 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import bench_app, latency_summary, login, register_user
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
+
+PASSWORD = "bench-password"
+
+
+async def _inline_run(operation, func, *args):
+    return func(*args)
+
+
+async def _login_loop(make_client, username: str, stop: asyncio.Event) -> int:
+    done = 0
+    async with make_client() as client:
+        while not stop.is_set():
+            response = await login(client, username, PASSWORD)
+            if response.status_code == 200:
+                done += 1
+
+    return done
+
+
+async def _me_loop(client, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/v1/auth/users/me")
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    return latencies
+
+
+async def run_scenario(logins: int, duration: float, inline: bool) -> dict:
+    original_run = password_hasher._run
+    if inline:
+        password_hasher._run = _inline_run
+
+    try:
+        async with bench_app() as (_, make_client):
+            async with make_client() as client:
+                for idx in range(logins + 1):
+                    await register_user(client, f"bench_user_{idx}", PASSWORD)
+
+                (await login(client, "bench_user_0", PASSWORD)).raise_for_status()
+
+                stop = asyncio.Event()
+                login_tasks = [
+                    asyncio.create_task(
+                        _login_loop(make_client, f"bench_user_{idx}", stop)
+                    )
+                    for idx in range(1, logins + 1)
+                ]
+                me_task = asyncio.create_task(_me_loop(client, stop))
+
+                await asyncio.sleep(duration)
+                stop.set()
+
+                latencies = await me_task
+                completed_logins = sum(await asyncio.gather(*login_tasks))
+    finally:
+        password_hasher._run = original_run
+
+    return {
+        "mode": "inline" if inline else f"pool:{password_hasher.executor_kind}",
+        "concurrent_logins": logins,
+        "logins_completed": completed_logins,
+        "users_me": latency_summary(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [
+        await run_scenario(args.logins, args.duration, inline=True),
+        await run_scenario(args.logins, args.duration, inline=False),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
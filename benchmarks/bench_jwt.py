@@ -0,0 +1,76 @@
+"""
+JWT sign / verify throughput per algorithm, with pre-parsed key objects.
+RS256 is also measured with PEM text keys, as the tokens were issued before.
+
+    python -m benchmarks.bench_jwt --seconds 1
+"""
+
+import argparse
+import json
+from typing import get_args
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+from benchmarks.common import ops_per_second  # paths and settings first
+from registration_app.api_v1.auth_crypto.keys import (
+    JWTAlgorithm,
+    generate_private_key,
+)
+
+PAYLOAD = {
+    "type": "access",
+    "sub": "1",
+    "username": "bench_user",
+    "email": "bench_user@example.com",
+    "exp": 4102444800,
+}
+
+
+def bench_algorithm(algorithm: str, private_key, public_key, seconds: float) -> dict:
+    token = jwt.encode(PAYLOAD, private_key, algorithm=algorithm)
+
+    return {
+        "sign_ops": ops_per_second(
+            lambda: jwt.encode(PAYLOAD, private_key, algorithm=algorithm),
+            seconds,
+        ),
+        "verify_ops": ops_per_second(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm]),
+            seconds,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = {}
+    for algorithm in get_args(JWTAlgorithm):
+        private_key = generate_private_key(algorithm)
+        public_key = private_key.public_key()
+        results[algorithm] = bench_algorithm(
+            algorithm, private_key, public_key, args.seconds
+        )
+
+        if algorithm == "RS256":
+            private_pem = private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            ).decode()
+            public_pem = public_key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            ).decode()
+            results["RS256 (PEM text)"] = bench_algorithm(
+                algorithm, private_pem, public_pem, args.seconds
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
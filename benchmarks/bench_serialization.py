@@ -0,0 +1,146 @@
+"""
+Response serialization cost per endpoint, in microseconds.
+
+"before" reproduces what FastAPI does for a returned pydantic model:
+dump it, validate it against the `response_model`, serialize it again
+and render it with the stdlib `JSONResponse`. "after" is the fast path
+of the endpoints: a dict rendered by `fast_json_response`.
+
+    python -m benchmarks.bench_serialization --seconds 0.5 --batch-size 500
+"""
+
+import argparse
+import json
+from functools import cache
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from benchmarks.common import microseconds_per_call  # paths and settings first
+from registration_app.api_v1.auth.jwt_auth import TokenInfo
+from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.core.responses import DefaultJSONResponse, fast_json_response
+from registration_app.core.schemas.user import (
+    BatchRegistrationResult,
+    BatchUserResult,
+    SuccessOperationUser,
+)
+
+USER = {"username": "bench_user", "email": "bench_user@example.com"}
+
+
+@cache
+def type_adapter(response_model: type[BaseModel]) -> TypeAdapter:
+    # FastAPI builds it once per route
+    return TypeAdapter(response_model)
+
+
+def default_response(
+    response_model: type[BaseModel] | None,
+    content,
+    exclude_none: bool = False,
+) -> bytes:
+    if response_model is None:
+        return JSONResponse(jsonable_encoder(content)).body
+
+    adapter = type_adapter(response_model)
+    if isinstance(content, BaseModel):
+        content = content.model_dump(by_alias=True, exclude_none=exclude_none)
+    value = adapter.validate_python(content)
+    data = adapter.dump_python(
+        value,
+        mode="json",
+        by_alias=True,
+        exclude_none=exclude_none,
+    )
+    return JSONResponse(data).body
+
+
+def batch_result(size: int) -> BatchRegistrationResult:
+    result = BatchRegistrationResult()
+    for row in range(size):
+        result.created += 1
+        result.results.append(
+            BatchUserResult(row=row, username=f"user_{row}", status="created")
+        )
+    return result
+
+
+def endpoints(batch_size: int) -> dict[str, tuple[Callable, Callable]]:
+    access_token = auth_utils.encode_jwt({"type": "access", "sub": "1", **USER})
+    refresh_token = auth_utils.encode_jwt({"type": "refresh", "sub": "1"})
+    operation = {"msg": "Password updated successfully!", **USER}
+    batch = batch_result(batch_size)
+
+    return {
+        "login": (
+            lambda: default_response(
+                TokenInfo,
+                TokenInfo(access_token=access_token, refresh_token=refresh_token),
+                exclude_none=True,
+            ),
+            lambda: fast_json_response(
+                {
+                    "access_token": access_token,
+                    "refresh_token": refresh_token,
+                    "token_type": "Bearer",
+                }
+            ).body,
+        ),
+        "refresh": (
+            lambda: default_response(
+                TokenInfo,
+                TokenInfo(access_token=access_token),
+                exclude_none=True,
+            ),
+            lambda: fast_json_response(
+                {"access_token": access_token, "token_type": "Bearer"}
+            ).body,
+        ),
+        "users_me": (
+            lambda: default_response(None, dict(USER)),
+            lambda: fast_json_response(dict(USER)).body,
+        ),
+        "change_password": (
+            lambda: default_response(
+                SuccessOperationUser,
+                SuccessOperationUser(**operation),
+            ),
+            lambda: fast_json_response(dict(operation)).body,
+        ),
+        "register_batch": (
+            lambda: default_response(
+                BatchRegistrationResult,
+                batch,
+                exclude_none=True,
+            ),
+            lambda: fast_json_response(batch.model_dump(exclude_none=True)).body,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=0.5, help="per measurement")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    results = {"response_class": DefaultJSONResponse.__name__}
+    for name, (before, after) in endpoints(args.batch_size).items():
+        assert json.loads(before()) == json.loads(after()), name
+
+        before_us = microseconds_per_call(before, args.seconds)
+        after_us = microseconds_per_call(after, args.seconds)
+        results[name] = {
+            "before_us": before_us,
+            "after_us": after_us,
+            "speedup": round(before_us / after_us, 2),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Per-call overhead of the user lookups: the old `select("*")` built on
+every call against the pre-built, column-projected `statements`.
+
+    python -m benchmarks.bench_statements --calls 5000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import create_sqlite_db_helper
+from registration_app.api_v1.auth.statements import select_profile_by_id
+from registration_app.core.models.user import User
+
+
+def _old_statement(user_id: int):
+    return select("*").where(User.id == user_id)
+
+
+def bench_build(calls: int) -> dict:
+    """Python-side cost only: statement construction + cache key."""
+    start = time.perf_counter()
+    for idx in range(calls):
+        _old_statement(idx)._generate_cache_key()
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        select_profile_by_id._generate_cache_key()
+    new = time.perf_counter() - start
+
+    return {
+        "old_us_per_call": round(old / calls * 1e6, 2),
+        "new_us_per_call": round(new / calls * 1e6, 2),
+    }
+
+
+async def bench_execute(calls: int) -> dict:
+    """Full round trip through the session against SQLite."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        helper = await create_sqlite_db_helper(Path(tmp_dir) / "bench.sqlite3")
+        async with helper.session_factory() as session:
+            await session.execute(
+                insert(User).values(
+                    username="bench_user",
+                    hashed_password="x" * 60,
+                    email="bench_user@example.com",
+                )
+            )
+            await session.commit()
+
+            start = time.perf_counter()
+            for _ in range(calls):
+                (await session.execute(_old_statement(1))).one_or_none()
+            old = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(calls):
+                (
+                    await session.execute(select_profile_by_id, {"user_id": 1})
+                ).one_or_none()
+            new = time.perf_counter() - start
+
+        await helper.dispose()
+
+    return {
+        "old_us_per_call": round(old / calls * 1e6, 2),
+        "new_us_per_call": round(new / calls * 1e6, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(json.dumps(
+        {
+            "build": bench_build(args.calls),
+            "execute_sqlite": await bench_execute(args.calls),
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
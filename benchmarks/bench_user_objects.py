@@ -0,0 +1,121 @@
+"""
+Cost of building the user objects of a request from DB rows and token
+claims, in microseconds.
+
+"before" validates them with the strict pydantic models the app used
+(`model_validate` with `from_attributes`, `EmailStr` parsing included),
+"after" is the trusted path: the slotted `UserProfile` / `UserSchema`.
+
+    python -m benchmarks.bench_user_objects --seconds 0.5
+"""
+
+import argparse
+import json
+from datetime import datetime
+from typing import Callable
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+from sqlalchemy import Row, create_engine, literal, select
+
+from benchmarks.common import microseconds_per_call  # paths and settings first
+from registration_app.core.schemas.user import UserProfile, UserSchema
+
+
+class ValidatedUserProfile(BaseModel):
+    model_config = ConfigDict(strict=True, from_attributes=True)
+
+    id: int
+    username: str
+    email: EmailStr
+    is_active: bool = True
+    credential_version: int = 0
+
+
+class ValidatedUserSchema(ValidatedUserProfile):
+    hashed_password: str
+    last_login_at: datetime | None = None
+
+
+def fetch_row(**values) -> Row:
+    # a real SQLAlchemy row, as returned by the crud functions
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        stmt = select(*(literal(value).label(name) for name, value in values.items()))
+        return conn.execute(stmt).one()
+
+
+def cases() -> dict[str, tuple[Callable, Callable]]:
+    profile = {
+        "id": 42,
+        "username": "bench_user",
+        "email": "bench_user@example.com",
+        "is_active": True,
+        "credential_version": 3,
+    }
+    profile_row = fetch_row(**profile)
+    login_row = fetch_row(
+        **profile,
+        hashed_password="$2b$12$" + "x" * 53,
+        last_login_at=datetime(2026, 10, 18, 12, 0),
+    )
+    claims = {
+        "sub": "42",
+        "username": "bench_user",
+        "email": "bench_user@example.com",
+        "active": True,
+        "cv": 3,
+    }
+
+    def profile_from_claims(model) -> Callable:
+        return lambda: model(
+            id=int(claims["sub"]),
+            username=claims["username"],
+            email=claims["email"],
+            is_active=claims["active"],
+            credential_version=claims["cv"],
+        )
+
+    return {
+        # `get_user_by_token_sub`, every authenticated request on a cache miss
+        "profile_row": (
+            lambda: ValidatedUserProfile.model_validate(profile_row),
+            lambda: UserProfile.from_row(profile_row),
+        ),
+        # `validate_auth_user`, every login
+        "login_row": (
+            lambda: ValidatedUserSchema.model_validate(login_row),
+            lambda: UserSchema.from_row(login_row),
+        ),
+        # `get_user_from_claims`, every request in stateless access mode
+        "claims": (
+            profile_from_claims(ValidatedUserProfile),
+            profile_from_claims(UserProfile),
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=0.5, help="per measurement")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (before, after) in cases().items():
+        expected = before()
+        assert expected.model_dump() == {
+            field: getattr(after(), field) for field in type(expected).model_fields
+        }, name
+
+        before_us = microseconds_per_call(before, args.seconds)
+        after_us = microseconds_per_call(after, args.seconds)
+        results[name] = {
+            "before_us": before_us,
+            "after_us": after_us,
+            "speedup": round(before_us / after_us, 2),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
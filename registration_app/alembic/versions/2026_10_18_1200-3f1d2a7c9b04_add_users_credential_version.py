@@ -0,0 +1,35 @@
+"""add users credential_version
+
+Revision ID: 3f1d2a7c9b04
+Revises: 8c5cfdae5fd9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1d2a7c9b04"
+down_revision: Union[str, None] = "8c5cfdae5fd9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "credential_version",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "credential_version")
@@ -0,0 +1,61 @@
+"""create revoked_tokens table
+
+Revision ID: a7e4c1d9f2b6
+Revises: 3f1d2a7c9b04
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7e4c1d9f2b6"
+down_revision: Union[str, None] = "3f1d2a7c9b04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name=op.f("fk_revoked_tokens_user_id_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("jti", name=op.f("pk_revoked_tokens")),
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_user_id"), "revoked_tokens", ["user_id"]
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_expires_at"), "revoked_tokens", ["expires_at"]
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_created_at"), "revoked_tokens", ["created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_revoked_tokens_created_at"), table_name="revoked_tokens"
+    )
+    op.drop_index(
+        op.f("ix_revoked_tokens_expires_at"), table_name="revoked_tokens"
+    )
+    op.drop_index(op.f("ix_revoked_tokens_user_id"), table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
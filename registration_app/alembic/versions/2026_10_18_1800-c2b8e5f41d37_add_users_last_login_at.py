@@ -0,0 +1,41 @@
+"""add users last_login_at
+
+Revision ID: c2b8e5f41d37
+Revises: a7e4c1d9f2b6
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2b8e5f41d37"
+down_revision: Union[str, None] = "a7e4c1d9f2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # logins were not recorded so far: existing users count as active now,
+    # not as dormant since their registration. A non-volatile default is
+    # evaluated once and kept in the catalog (postgres 11+): no row is
+    # rewritten or locked, unlike an UPDATE of the whole table
+    op.add_column(
+        "users",
+        sa.Column(
+            "last_login_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=True,
+        ),
+    )
+    # users registered from now on have none until they log in
+    op.alter_column("users", "last_login_at", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("users", "last_login_at")
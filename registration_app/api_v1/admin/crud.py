@@ -0,0 +1,75 @@
+"""
+Admin reads of the users table: keyset pages and a streamed export.
+Both select `USER_COLUMNS` only, never the password hash.
+"""
+
+import logging
+from typing import AsyncIterator, Sequence
+from sqlalchemy import Row, bindparam, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.api_v1.auth.crud import exception_unexpected
+from registration_app.core.metrics import db_query_duration
+from registration_app.core.models.db_helper import release_connection
+from registration_app.core.models.user import User
+
+
+log = logging.getLogger(__name__)
+
+
+USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+
+# keyset pagination: the page after `after_id`, whatever the table size
+select_users_page = (
+    select(*USER_COLUMNS)
+    .where(User.id > bindparam("after_id"))
+    .order_by(User.id)
+    .limit(bindparam("limit"))
+)
+
+select_users_export = select(*USER_COLUMNS).order_by(User.id)
+
+async def get_users_page(
+    session: AsyncSession,
+    after_id: int,
+    limit: int,
+) -> Sequence[Row]:
+
+    try:
+        with db_query_duration.time(function="get_users_page"):
+            res = await session.execute(
+                select_users_page,
+                {"after_id": after_id, "limit": limit},
+            )
+            users = res.all()
+        await release_connection(session)
+        return users
+
+    except OperationalError:
+        log.exception("Database error listing users after %s", after_id)
+        raise exception_unexpected
+    except Exception:
+        log.exception("Unexpected error listing users after %s", after_id)
+        raise exception_unexpected
+
+
+async def stream_users(
+    session: AsyncSession,
+    batch_size: int,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Every user in batches of `batch_size`, from a server-side cursor:
+    memory stays constant whatever the table size.
+    """
+    result = await session.stream(
+        select_users_export.execution_options(yield_per=batch_size)
+    )
+    async for users in result.partitions():
+        yield users
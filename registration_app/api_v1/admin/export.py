@@ -0,0 +1,45 @@
+import csv
+import io
+from typing import Callable, Sequence
+from sqlalchemy import Row
+from registration_app.core.responses import dump_json
+from .crud import USER_COLUMNS
+
+
+CSV_HEADER = [column.key for column in USER_COLUMNS]
+
+
+def user_to_dict(user: Row) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat(),
+    }
+
+
+def encode_ndjson(users: Sequence[Row]) -> bytes:
+    return b"".join(dump_json(user_to_dict(user)) + b"\n" for user in users)
+
+
+def encode_csv(users: Sequence[Row]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user in users:
+        writer.writerow(user_to_dict(user).values())
+    return buffer.getvalue().encode()
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_HEADER)
+    return buffer.getvalue().encode()
+
+
+# format -> (media type, header, encoder of a batch of rows)
+EXPORT_FORMATS: dict[str, tuple[str, bytes, Callable[[Sequence[Row]], bytes]]] = {
+    "ndjson": ("application/x-ndjson", b"", encode_ndjson),
+    "csv": ("text/csv", csv_header(), encode_csv),
+}
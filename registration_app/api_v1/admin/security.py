@@ -0,0 +1,27 @@
+from secrets import compare_digest
+from fastapi import HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+from registration_app.core.config import settings
+
+
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+
+async def require_admin_key(
+    api_key: str | None = Security(admin_key_header),
+) -> None:
+    expected = settings.admin.api_key
+    if expected is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="admin API is disabled",
+        )
+
+    if api_key is None or not compare_digest(
+        api_key.encode(),
+        expected.get_secret_value().encode(),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid admin key",
+        )
@@ -0,0 +1,79 @@
+import logging
+from contextlib import AbstractAsyncContextManager
+from typing import AsyncIterator, Callable, Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.core import db_helper
+from registration_app.core.config import settings
+from registration_app.core.responses import fast_json_response
+from registration_app.core.schemas.user import AdminUsersPage
+from .crud import get_users_page, stream_users
+from .export import EXPORT_FORMATS, user_to_dict
+from .security import require_admin_key
+
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix=settings.api.v1.admin,
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_key)],
+)
+
+
+@router.get("/users", response_model=AdminUsersPage)
+async def list_users(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.admin.max_page_size),
+    session: AsyncSession = Depends(db_helper.replica_session_getter),
+):
+    """Users ordered by id, a page after the id of the last one seen."""
+    # one more row tells whether there is a next page
+    users = await get_users_page(session, after_id, limit + 1)
+    next_after_id = users[limit - 1].id if len(users) > limit else None
+
+    return fast_json_response(
+        {
+            "users": [user_to_dict(user) for user in users[:limit]],
+            "next_after_id": next_after_id,
+        }
+    )
+
+
+@router.get("/users/export")
+async def export_users(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    replica_session: Callable[[], AbstractAsyncContextManager[AsyncSession]] = Depends(
+        db_helper.replica_sessions_getter
+    ),
+):
+    """
+    Every user, streamed as NDJSON or CSV from a server-side cursor.
+    Rows are sent as they are read, a transaction stays open meanwhile.
+    """
+    media_type, header, encode = EXPORT_FORMATS[export_format]
+
+    async def content() -> AsyncIterator[bytes]:
+        # the session of a dependency would be closed before the body is sent
+        async with replica_session() as session:
+            if header:
+                yield header
+            try:
+                async for users in stream_users(
+                    session,
+                    settings.admin.export_batch_size,
+                ):
+                    yield encode(users)
+            except Exception:
+                # the status is sent already, the client gets a truncated body
+                log.exception("Users export failed")
+                raise
+
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{export_format}"',
+        },
+    )
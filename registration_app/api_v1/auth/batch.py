@@ -0,0 +1,131 @@
+import json
+from typing import AsyncIterator
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from registration_app.core.schemas.user import BatchUserResult, CreateUser
+
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+
+# a parsed row: its position in the body and the user, or why it is invalid
+BatchRow = tuple[int, CreateUser | BatchUserResult]
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=detail,
+    )
+
+
+async def _iter_body(request: Request, max_body_size: int) -> AsyncIterator[bytes]:
+    # Content-Length is checked first, the stream still is: it may be chunked
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit():
+        if int(content_length) > max_body_size:
+            raise _too_large(f"body larger than {max_body_size} bytes")
+
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_body_size:
+            raise _too_large(f"body larger than {max_body_size} bytes")
+        yield chunk
+
+
+async def _iter_ndjson_lines(
+    request: Request,
+    max_body_size: int,
+) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in _iter_body(request, max_body_size):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+
+    if buffer.strip():
+        yield buffer
+
+
+async def _iter_json_items(
+    request: Request,
+    max_body_size: int,
+    max_rows: int,
+) -> AsyncIterator[object]:
+    body = b"".join([chunk async for chunk in _iter_body(request, max_body_size)])
+    try:
+        items = json.loads(body)
+    except json.JSONDecodeError as ex:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"invalid JSON: {ex}",
+        )
+
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="expected a JSON array of users",
+        )
+
+    # known before anything is registered
+    if len(items) > max_rows:
+        raise _too_large(f"more than {max_rows} rows")
+
+    for item in items:
+        yield item
+
+
+def _parse_row(row: int, item: bytes | object) -> BatchRow:
+    try:
+        if isinstance(item, bytes):
+            return row, CreateUser.model_validate_json(item)
+        return row, CreateUser.model_validate(item)
+
+    except ValidationError as ex:
+        username = item.get("username") if isinstance(item, dict) else None
+        return row, BatchUserResult(
+            row=row,
+            username=username if isinstance(username, str) else None,
+            status="invalid",
+            detail="; ".join(
+                ": ".join(filter(None, (".".join(map(str, err["loc"])), err["msg"])))
+                for err in ex.errors()
+            ),
+        )
+
+
+async def iter_batch_rows(
+    request: Request,
+    chunk_size: int,
+    max_rows: int,
+    max_body_size: int,
+) -> AsyncIterator[list[BatchRow]]:
+    """
+    Parse the body of `/register/batch` into chunks of rows.
+    NDJSON bodies are read as a stream, so only one chunk is in memory:
+    one over `max_rows` or `max_body_size` raises 413 once the chunks
+    before it are yielded already.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    items = (
+        _iter_ndjson_lines(request, max_body_size)
+        if content_type in NDJSON_CONTENT_TYPES
+        else _iter_json_items(request, max_body_size, max_rows)
+    )
+
+    chunk = []
+    row = 0
+    async for item in items:
+        if row >= max_rows:
+            raise _too_large(f"more than {max_rows} rows")
+
+        chunk.append(_parse_row(row, item))
+        row += 1
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
@@ -0,0 +1,127 @@
+"""
+Per-worker Bloom filters of keys stored in a table, loaded periodically.
+
+A `BloomIndex` answers "was this key never stored?" without the DB; a
+hit may be a false positive and is confirmed by a lookup. The filter is
+loaded on startup by streaming the table, extended every
+`refresh_interval` seconds with the rows written since (by any worker)
+and, optionally, rebuilt every `rebuild_interval` seconds to drop the
+rows deleted meanwhile. Until the first successful load `loaded` is
+False and every check goes to the DB.
+
+Subclasses select (key, position) rows: the position (an id, a
+timestamp...) only grows with new rows, refreshes start `overlap`
+before the highest one loaded to catch rows committed late.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from time import monotonic
+from typing import Any, Generic, TypeVar
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from registration_app.core.metrics import cache_entries, registry as metrics_registry
+from registration_app.core.utils.bloom import BloomFilter
+
+
+log = logging.getLogger(__name__)
+
+P = TypeVar("P")
+
+LOAD_BATCH_SIZE = 10_000
+
+
+class BloomIndex(ABC, Generic[P]):
+    overlap: Any
+
+    def __init__(self, name: str, capacity: int, error_rate: float) -> None:
+        self.name = name
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.loaded = False
+        # highest position loaded, None while the table is empty
+        self.position: P | None = None
+        metrics_registry.on_collect(self._collect_metrics)
+
+    @abstractmethod
+    def _statement(self, since: P | None) -> Select:
+        """(key, position) of the rows from `since` on, of every row without."""
+
+    async def _load_into(
+        self,
+        session: AsyncSession,
+        bloom: BloomFilter,
+        since: P | None,
+    ) -> P | None:
+        """Add the keys of the rows from `since` on, return the last position."""
+        stmt = self._statement(since).execution_options(yield_per=LOAD_BATCH_SIZE)
+
+        position = self.position if since is not None else None
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            for key, row_position in rows:
+                # overlapping loads see rows twice
+                if key not in bloom:
+                    bloom.add(key)
+                if position is None or row_position > position:
+                    position = row_position
+
+        return position
+
+    async def load(self, session: AsyncSession) -> None:
+        """Rebuild the filter from the whole table."""
+        # twice as large as long as the keys don't fit
+        capacity = self.bloom.capacity
+        while capacity < len(self.bloom):
+            capacity *= 2
+
+        bloom = BloomFilter(capacity, self.bloom.error_rate)
+        position = await self._load_into(session, bloom, since=None)
+        self.bloom, self.position, self.loaded = bloom, position, True
+        log.info("Loaded %d keys into the %s filter", len(bloom), self.name)
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Add the rows written since the last load, by any worker."""
+        if not self.loaded or len(self.bloom) > self.bloom.capacity:
+            await self.load(session)
+            return
+
+        since = None if self.position is None else self.position - self.overlap
+        self.position = await self._load_into(session, self.bloom, since=since)
+
+    def add(self, key: str) -> None:
+        self.bloom.add(key)
+
+    async def load_once(self, session_factory: async_sessionmaker) -> None:
+        try:
+            async with session_factory() as session:
+                await self.load(session)
+        except Exception:
+            # checks keep going to the DB until a refresh succeeds
+            log.exception("Could not load the %s filter", self.name)
+
+    async def maintain(
+        self,
+        session_factory: async_sessionmaker,
+        refresh_interval: float,
+        rebuild_interval: float | None = None,
+    ) -> None:
+        """Refresh the filter, rebuild it from time to time, until cancelled."""
+        next_rebuild = None
+        if rebuild_interval is not None:
+            next_rebuild = monotonic() + rebuild_interval
+
+        while True:
+            await asyncio.sleep(refresh_interval)
+            try:
+                async with session_factory() as session:
+                    if next_rebuild is not None and monotonic() >= next_rebuild:
+                        next_rebuild = monotonic() + rebuild_interval
+                        await self.load(session)
+                    else:
+                        await self.refresh(session)
+            except Exception:
+                log.exception("Could not refresh the %s filter", self.name)
+
+    def _collect_metrics(self) -> None:
+        cache_entries.set(len(self.bloom), cache=self.name)
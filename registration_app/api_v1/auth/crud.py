@@ -1,10 +1,28 @@
-from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.api_v1.auth.user_cache import forget_user
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
 from registration_app.core.schemas.user import CreateUser
 from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.core.models.revoked_token import RevokedToken
+from registration_app.core.models.db_helper import release_connection
 from registration_app.core.models.user import User
-from sqlalchemy import select, insert, update
+from registration_app.core.metrics import db_query_duration
+from registration_app.api_v1.auth.statements import (
+    PROFILE_COLUMNS,
+    select_login_by_username,
+    select_password_by_id,
+    select_profile_by_id,
+    select_revoked_token_by_jti,
+    select_user_id_by_username,
+)
+from datetime import datetime
+from sqlalchemy import Row, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, OperationalError
 from fastapi import HTTPException, status
+import logging
+
+
+log = logging.getLogger(__name__)
 
 
 exception_creating_user = HTTPException(
@@ -21,8 +39,9 @@ exception_unexpected = HTTPException(
 async def create_user(
     session: AsyncSession,
     user: CreateUser,
-) -> None:
-    password_hashed = auth_utils.hash_password(user.password).decode()
+) -> Row:
+    """Insert the user, return its profile projection."""
+    password_hashed = (await password_hasher.hash_password(user.password)).decode()
 
     try:
         stmt = (
@@ -32,9 +51,12 @@ async def create_user(
                 hashed_password=password_hashed,
                 email=user.email
             )
+            .returning(*PROFILE_COLUMNS)
         )
-        await session.execute(stmt)
-        await session.commit()
+        with db_query_duration.time(function="create_user"):
+            res = await session.execute(stmt)
+            created = res.one()
+            await session.commit()
 
     except IntegrityError:
         await session.rollback()
@@ -44,57 +66,152 @@ async def create_user(
         )
 
     except OperationalError:
-        # logger.error(f"Database error: {e}")
+        log.exception("Database error creating user %r", user.username)
         await session.rollback()
         raise exception_creating_user
 
-    except Exception as e:
-        # logger.exception(f"Unexpected error creating user: {e}")
+    except Exception:
+        log.exception("Unexpected error creating user %r", user.username)
         await session.rollback()
         raise exception_unexpected
 
+    return created
 
-async def get_user_by_id(
+
+async def create_users(
     session: AsyncSession,
-    user_id: str,
-) -> User | None:
+    users: list[CreateUser],
+) -> set[str]:
+    """Insert users skipping existing usernames, return the created ones."""
+    passwords_hashed = await password_hasher.hash_passwords(
+        [user.password for user in users]
+    )
 
     try:
         stmt = (
-            select("*")
-            .where(User.id == int(user_id))
+            pg_insert(User)
+            .on_conflict_do_nothing()
+            .returning(User.username)
         )
-        res = await session.execute(stmt)
-        return res.one_or_none()
+        rows = [
+            {
+                "username": user.username,
+                "hashed_password": password_hashed.decode(),
+                "email": user.email,
+            }
+            for user, password_hashed in zip(users, passwords_hashed)
+        ]
+        with db_query_duration.time(function="create_users"):
+            res = await session.scalars(stmt, rows)
+            created = set(res.all())
+            await session.commit()
+
+    except OperationalError:
+        log.exception("Database error creating %d users", len(users))
+        await session.rollback()
+        raise exception_creating_user
+
+    except Exception:
+        log.exception("Unexpected error creating %d users", len(users))
+        await session.rollback()
+        raise exception_unexpected
+
+    return created
+
+
+async def get_user_by_id(
+    session: AsyncSession,
+    user_id: str,
+) -> Row | None:
+    """Profile projection of the user, see `statements.PROFILE_COLUMNS`."""
+
+    try:
+        with db_query_duration.time(function="get_user_by_id"):
+            res = await session.execute(
+                select_profile_by_id,
+                {"user_id": int(user_id)},
+            )
+            user = res.one_or_none()
+        await release_connection(session)
+        return user
 
     except OperationalError:
-        # logger.exception(f"Unexpected error getting user: {e}")
+        log.exception("Database error getting user %s", user_id)
         raise exception_unexpected
-    except Exception as e:
-        # logger.exception(f"Unexpected error getting user: {e}")
-        print(e)
+    except Exception:
+        log.exception("Unexpected error getting user %s", user_id)
         raise exception_unexpected
 
 
 async def get_user_by_username(
     session: AsyncSession,
     username: str,
-) -> User | None:
+) -> Row | None:
+    """Login projection of the user, see `statements.LOGIN_COLUMNS`."""
 
     try:
-        stmt = (
-            select("*")
-            .where(User.username == username)
-        )
-        res = await session.execute(stmt)
-        return res.one_or_none()
+        with db_query_duration.time(function="get_user_by_username"):
+            res = await session.execute(
+                select_login_by_username,
+                {"username": username},
+            )
+            user = res.one_or_none()
+        # not held while the password is verified
+        await release_connection(session)
+        return user
+
+    except OperationalError:
+        log.exception("Database error getting user %r", username)
+        raise exception_unexpected
+    except Exception:
+        log.exception("Unexpected error getting user %r", username)
+        raise exception_unexpected
+
+
+async def is_username_taken(
+    session: AsyncSession,
+    username: str,
+) -> bool:
+
+    try:
+        with db_query_duration.time(function="is_username_taken"):
+            res = await session.execute(
+                select_user_id_by_username,
+                {"username": username},
+            )
+            taken = res.scalar_one_or_none() is not None
+        await release_connection(session)
+        return taken
+
+    except OperationalError:
+        log.exception("Database error checking username %r", username)
+        raise exception_unexpected
+    except Exception:
+        log.exception("Unexpected error checking username %r", username)
+        raise exception_unexpected
+
+
+async def get_user_password_hash(
+    session: AsyncSession,
+    user_id: int,
+) -> str | None:
+
+    try:
+        with db_query_duration.time(function="get_user_password_hash"):
+            res = await session.execute(
+                select_password_by_id,
+                {"user_id": user_id},
+            )
+            hashed_password = res.scalar_one_or_none()
+        # not held while the password is verified and the new one hashed
+        await release_connection(session)
+        return hashed_password
 
     except OperationalError:
-        # logger.exception(f"Unexpected error getting user: {e}")
+        log.exception("Database error getting password of user %s", user_id)
         raise exception_unexpected
-    except Exception as e:
-        # logger.exception(f"Unexpected error getting user: {e}")
-        print(e)
+    except Exception:
+        log.exception("Unexpected error getting password of user %s", user_id)
         raise exception_unexpected
 
 
@@ -102,47 +219,261 @@ async def update_user_password(
     session: AsyncSession,
     user_id: int,
     new_password: str,
-) -> None:
-    password_hashed = auth_utils.hash_password(new_password).decode()
+) -> Row | None:
+    """Return the updated profile projection, None if there is no such user."""
+    password_hashed = (await password_hasher.hash_password(new_password)).decode()
 
     try:
         stmt = (
             update(User)
             .where(User.id == user_id)
-            .values(hashed_password=password_hashed)
+            .values(
+                hashed_password=password_hashed,
+                credential_version=User.credential_version + 1,
+            )
+            .returning(*PROFILE_COLUMNS)
         )
-        await session.execute(stmt)
-        await session.commit()
+        with db_query_duration.time(function="update_user_password"):
+            res = await session.execute(stmt)
+            updated = res.one_or_none()
+            await session.commit()
+        forget_user(user_id)
 
     except OperationalError:
-        # logger.exception(f"Unexpected error getting user: {e}")
+        log.exception("Database error updating password of user %s", user_id)
         await session.rollback()
         raise exception_unexpected
-    except Exception as e:
-        # logger.exception(f"Unexpected error getting user: {e}")
+    except Exception:
+        log.exception("Unexpected error updating password of user %s", user_id)
         await session.rollback()
         raise exception_unexpected
 
+    return updated
+
+
+async def replace_password_hash(
+    session: AsyncSession,
+    user_id: int,
+    old_hash: str,
+    new_hash: str,
+) -> bool:
+    """
+    Store a new hash of the same password, unless the password was
+    changed meanwhile. Tokens stay valid: the credentials are the same.
+    """
+
+    stmt = (
+        update(User)
+        .where(User.id == user_id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+    with db_query_duration.time(function="replace_password_hash"):
+        res = await session.execute(stmt)
+        await session.commit()
+
+    return res.rowcount == 1
+
 
 async def deactivate_user_account(
     session: AsyncSession,
     user_id: int,
-) -> None:
+) -> Row | None:
+    """Return the updated profile projection, None if there is no such user."""
     try:
         stmt = (
             update(User)
             .where(User.id == user_id)
-            .values(is_active=False)
+            .values(
+                is_active=False,
+                credential_version=User.credential_version + 1,
+            )
+            .returning(*PROFILE_COLUMNS)
         )
 
-        await session.execute(stmt)
-        await session.commit()
+        with db_query_duration.time(function="deactivate_user_account"):
+            res = await session.execute(stmt)
+            deactivated = res.one_or_none()
+            await session.commit()
+        forget_user(user_id)
+
+    except OperationalError:
+        log.exception("Database error deactivating user %s", user_id)
+        await session.rollback()
+        raise exception_unexpected
+    except Exception:
+        log.exception("Unexpected error deactivating user %s", user_id)
+        await session.rollback()
+        raise exception_unexpected
+
+    return deactivated
+
+
+async def revoke_token(
+    session: AsyncSession,
+    jti: str,
+    user_id: int,
+    expires_at: datetime,
+) -> None:
+    try:
+        stmt = (
+            pg_insert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing()
+        )
+        with db_query_duration.time(function="revoke_token"):
+            await session.execute(stmt)
+            await session.commit()
 
     except OperationalError:
-        # logger.exception(f"Unexpected error getting user: {e}")
+        log.exception("Database error revoking token of user %s", user_id)
         await session.rollback()
         raise exception_unexpected
-    except Exception as e:
-        # logger.exception(f"Unexpected error getting user: {e}")
+    except Exception:
+        log.exception("Unexpected error revoking token of user %s", user_id)
         await session.rollback()
         raise exception_unexpected
+
+
+async def is_token_revoked(
+    session: AsyncSession,
+    jti: str,
+) -> bool:
+    try:
+        with db_query_duration.time(function="is_token_revoked"):
+            res = await session.execute(
+                select_revoked_token_by_jti,
+                {"jti": jti},
+            )
+            revoked = res.scalar_one_or_none() is not None
+        await release_connection(session)
+        return revoked
+
+    except OperationalError:
+        log.exception("Database error checking token")
+        raise exception_unexpected
+    except Exception:
+        log.exception("Unexpected error checking token")
+        raise exception_unexpected
+
+
+async def purge_revoked_tokens(
+    session: AsyncSession,
+    expired_before: datetime,
+    limit: int,
+) -> int:
+    """Delete up to `limit` revoked tokens that expired before `expired_before`."""
+
+    expired = (
+        select(RevokedToken.jti)
+        .where(RevokedToken.expires_at < expired_before)
+        .limit(limit)
+    )
+    stmt = delete(RevokedToken).where(RevokedToken.jti.in_(expired))
+    with db_query_duration.time(function="purge_revoked_tokens"):
+        res = await session.execute(stmt)
+        await session.commit()
+
+    return res.rowcount
+
+
+async def record_login(
+    session: AsyncSession,
+    user_id: int,
+    logged_in_at: datetime,
+    not_since: datetime,
+) -> None:
+    """Store the login time, unless one after `not_since` is stored already."""
+
+    stmt = (
+        update(User)
+        .where(
+            User.id == user_id,
+            or_(User.last_login_at.is_(None), User.last_login_at < not_since),
+        )
+        .values(last_login_at=logged_in_at)
+    )
+    with db_query_duration.time(function="record_login"):
+        await session.execute(stmt)
+        await session.commit()
+
+
+# maintenance jobs: each call is one short transaction over a range of ids
+
+def _last_seen_at():
+    # users who never logged in since it was recorded: their registration
+    return func.coalesce(User.last_login_at, User.created_at)
+
+
+async def get_user_id_bounds(session: AsyncSession) -> tuple[int, int] | None:
+    res = await session.execute(select(func.min(User.id), func.max(User.id)))
+    first_id, last_id = res.one()
+    await release_connection(session)
+    return None if first_id is None else (first_id, last_id)
+
+
+async def deactivate_dormant_users(
+    session: AsyncSession,
+    first_id: int,
+    last_id: int,
+    seen_before: datetime,
+) -> list[int]:
+    """Deactivate the users of the range not seen since `seen_before`, return their ids."""
+
+    stmt = (
+        update(User)
+        .where(
+            User.id.between(first_id, last_id),
+            User.is_active.is_(True),
+            _last_seen_at() < seen_before,
+        )
+        .values(
+            is_active=False,
+            credential_version=User.credential_version + 1,
+        )
+        .returning(User.id)
+    )
+    with db_query_duration.time(function="deactivate_dormant_users"):
+        res = await session.scalars(stmt)
+        user_ids = list(res.all())
+        await session.commit()
+
+    for user_id in user_ids:
+        forget_user(user_id)
+    return user_ids
+
+
+async def delete_inactive_users(
+    session: AsyncSession,
+    first_id: int,
+    last_id: int,
+    updated_before: datetime,
+) -> int:
+    """Delete the deactivated users of the range unchanged since `updated_before`."""
+
+    stmt = delete(User).where(
+        User.id.between(first_id, last_id),
+        User.is_active.is_(False),
+        User.updated_at < updated_before,
+    )
+    with db_query_duration.time(function="delete_inactive_users"):
+        res = await session.execute(stmt)
+        await session.commit()
+
+    return res.rowcount
+
+
+async def count_users(session: AsyncSession, seen_before: datetime) -> Row:
+    """Users in total, active ones and active ones not seen since `seen_before`."""
+
+    stmt = select(
+        func.count().label("total"),
+        func.count().filter(User.is_active.is_(True)).label("active"),
+        func.count()
+        .filter(User.is_active.is_(True), _last_seen_at() < seen_before)
+        .label("dormant"),
+    )
+    with db_query_duration.time(function="count_users"):
+        res = await session.execute(stmt)
+        counts = res.one()
+    await release_connection(session)
+    return counts
@@ -1,12 +1,16 @@
-from registration_app.core.schemas.user import UserSchema
+from registration_app.core.schemas.user import UserProfile
 from registration_app.api_v1.auth_crypto import utils as auth_utils
 from registration_app.core.config import settings
 from datetime import timedelta
+from uuid import uuid4
 
 
 TOKEN_TYPE_FIELD = "type"
 ACCESS_TOKEN_TYPE = "access"
 REFRESH_TOKEN_TYPE = "refresh"
+ACTIVE_CLAIM = "active"
+CREDENTIAL_VERSION_CLAIM = "cv"
+TOKEN_ID_CLAIM = "jti"
 
 
 def create_jwt(
@@ -15,7 +19,11 @@ def create_jwt(
         expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
         expire_timedelta: timedelta | None = None
 ) -> str:
-    jwt_payload = {TOKEN_TYPE_FIELD: token_type}
+    jwt_payload = {
+        TOKEN_TYPE_FIELD: token_type,
+        # unique per token, lets a single token be revoked
+        TOKEN_ID_CLAIM: uuid4().hex,
+    }
     jwt_payload.update(token_data)
 
     return auth_utils.encode_jwt(
@@ -25,11 +33,13 @@ def create_jwt(
     )
 
 
-def create_access_token(user: UserSchema) -> str:
+def create_access_token(user: UserProfile) -> str:
     jwt_payload = {
         "sub": str(user.id),
         "username": user.username,
         "email": user.email,
+        ACTIVE_CLAIM: user.is_active,
+        CREDENTIAL_VERSION_CLAIM: user.credential_version,
     }
 
     return create_jwt(
@@ -39,9 +49,11 @@ def create_access_token(user: UserSchema) -> str:
     )
 
 
-def create_refresh_token(user: UserSchema) -> str:
+def create_refresh_token(user: UserProfile) -> str:
     jwt_payload = {
-        "sub": str(user.id)
+        "sub": str(user.id),
+        # a password change or a deactivation invalidates it
+        CREDENTIAL_VERSION_CLAIM: user.credential_version,
     }
 
     return create_jwt(
@@ -1,4 +1,4 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from registration_app.core.config import settings
 from registration_app.api_v1.auth.helpers import (
     create_access_token,
@@ -9,14 +9,36 @@ from registration_app.api_v1.auth.helpers import (
 from registration_app.api_v1.auth.validation import (
     get_current_auth_user,
     get_current_auth_user_for_refresh,
-    get_current_token_payload_access,
+    get_optional_token_payload_refresh,
+    get_current_user_profile,
+)
+from registration_app.core.schemas.user import (
+    UserProfile,
+    UserSchema,
+    SuccessOperationUser,
 )
-from registration_app.core.schemas.user import UserSchema, SuccessOperationUser
 from registration_app.core import db_helper
-from .crud import get_user_by_username
-from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.core.responses import fast_json_response
+from .crud import get_user_by_username, record_login, replace_password_hash
+from registration_app.api_v1.auth.revocation import revocation_store
+from .rate_limit import throttle_login
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, Form, HTTPException, status, Response
+from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Form,
+    HTTPException,
+    status,
+)
+import logging
+from datetime import datetime, timedelta
+from registration_app.core.utils.dates import utc_now
+
+
+log = logging.getLogger(__name__)
 
 
 router = APIRouter(
@@ -31,10 +53,88 @@ class TokenInfo(BaseModel):
     token_type: str = "Bearer"
 
 
+def issue_tokens_response(user: UserProfile, content: dict | None = None) -> JSONResponse:
+    """A new access and refresh token for the user, in the body and in cookies."""
+    access_token = create_access_token(user)
+    refresh_token = create_refresh_token(user)
+
+    response = fast_json_response(
+        {
+            **(content or {}),
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "Bearer",
+        }
+    )
+    response.set_cookie(
+        key=f"{ACCESS_TOKEN_TYPE}_token",
+        value=access_token,
+        httponly=True,
+        max_age=settings.auth_jwt.access_token_expire_minutes * 60,
+    )
+    response.set_cookie(
+        key=f"{REFRESH_TOKEN_TYPE}_token",
+        value=refresh_token,
+        httponly=True,
+        max_age=settings.auth_jwt.access_token_expire_minutes * 3600 * 24,
+    )
+
+    return response
+
+
+def ensure_active_user(user: UserProfile) -> None:
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="user inactive",
+        )
+
+
+async def rehash_password(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: int,
+    password: str,
+    old_hash: str,
+) -> None:
+    """Background task: hash the password again with the configured cost."""
+    try:
+        new_hash = (await password_hasher.hash_password(password)).decode()
+        async with session_factory() as session:
+            if await replace_password_hash(session, user_id, old_hash, new_hash):
+                log.info(
+                    "Rehashed password of user %s with %d rounds",
+                    user_id,
+                    password_hasher.rounds,
+                )
+    except Exception:
+        log.exception("Could not rehash password of user %s", user_id)
+
+
+async def record_last_login(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: int,
+    logged_in_at: datetime,
+) -> None:
+    """Background task: store the login time, for the dormant accounts job."""
+    resolution = timedelta(seconds=settings.maintenance.last_login_resolution)
+    not_since = logged_in_at - resolution
+    try:
+        async with session_factory() as session:
+            await record_login(session, user_id, logged_in_at, not_since)
+    except Exception:
+        log.exception("Could not record the login of user %s", user_id)
+
+
 async def validate_auth_user(
+    background_tasks: BackgroundTasks,
+    _: None = Depends(throttle_login),
     username: str = Form(),
     password: str = Form(),
     session: AsyncSession = Depends(db_helper.session_getter),
+    # the request session is closed once the background tasks run
+    session_factory: async_sessionmaker[AsyncSession] = Depends(
+        db_helper.session_factory_getter
+    ),
 ) -> UserSchema:
     unauthed_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,30 +145,57 @@ async def validate_auth_user(
     if user is None:
         raise unauthed_exc
 
-    user_schem = UserSchema.model_validate(user)
+    user_schem = UserSchema.from_row(user)
 
-    if not auth_utils.validate_password(password, user_schem.hashed_password):
+    if not await password_hasher.validate_password(
+        password,
+        user_schem.hashed_password,
+    ):
         raise unauthed_exc
 
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="user inactive",
+    ensure_active_user(user_schem)
+
+    # a write per user and `last_login_resolution`, not per login
+    logged_in_at = utc_now()
+    if user_schem.last_login_at is None or (
+        logged_in_at - user_schem.last_login_at
+        > timedelta(seconds=settings.maintenance.last_login_resolution)
+    ):
+        background_tasks.add_task(
+            record_last_login,
+            session_factory,
+            user_schem.id,
+            logged_in_at,
+        )
+
+    # after the response: the login doesn't wait for a second bcrypt run
+    if (
+        settings.hashing.rehash_on_login
+        and password_hasher.needs_rehash(user_schem.hashed_password)
+    ):
+        background_tasks.add_task(
+            rehash_password,
+            session_factory,
+            user_schem.id,
+            password,
+            user_schem.hashed_password,
         )
 
     return user_schem
 
 
 async def get_current_active_auth_user(
-    user: UserSchema = Depends(get_current_auth_user),
-) -> UserSchema:
-    if user.is_active:
-        return user
+    user: UserProfile = Depends(get_current_auth_user),
+) -> UserProfile:
+    ensure_active_user(user)
+    return user
 
-    raise HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="user inactive",
-    )
+
+async def get_current_active_user_profile(
+    user: UserProfile = Depends(get_current_user_profile),
+) -> UserProfile:
+    ensure_active_user(user)
+    return user
 
 
 @router.post(
@@ -77,26 +204,9 @@ async def get_current_active_auth_user(
     response_model_exclude_none=True,
 )
 async def auth_user_issue_jwt(
-    response: Response,
     user: UserSchema = Depends(validate_auth_user),
 ):
-    access_token = create_access_token(user)
-    refresh_token = create_refresh_token(user)
-
-    response.set_cookie(
-        key=f"{ACCESS_TOKEN_TYPE}_token",
-        value=access_token,
-        httponly=True,
-        max_age=settings.auth_jwt.access_token_expire_minutes * 60,
-    )
-    response.set_cookie(
-        key=f"{REFRESH_TOKEN_TYPE}_token",
-        value=refresh_token,
-        httponly=True,
-        max_age=settings.auth_jwt.access_token_expire_minutes * 3600 * 24,
-    )
-
-    return TokenInfo(access_token=access_token, refresh_token=refresh_token)
+    return issue_tokens_response(user)
 
 
 @router.post(
@@ -104,10 +214,19 @@ async def auth_user_issue_jwt(
     response_model=SuccessOperationUser,
     response_model_exclude_none=True,
 )
-def logout_user(
-    response: Response,
-    _=Depends(get_current_token_payload_access),
+async def logout_user(
+    refresh_payload: dict | None = Depends(get_optional_token_payload_refresh),
+    session: AsyncSession = Depends(db_helper.session_getter),
 ):
+    # no access token needed: the refresh token still has to be revoked
+    # once the short-lived access token has expired, a copy must not
+    # outlive the logout. Without a valid one, only the cookies go
+    if refresh_payload is not None:
+        await revocation_store.revoke(session, refresh_payload)
+
+    response = fast_json_response(
+        {"msg": "You have successfully logged out."}
+    )
     response.delete_cookie(
         key=f"{REFRESH_TOKEN_TYPE}_token",
         httponly=True,
@@ -117,9 +236,7 @@ def logout_user(
         httponly=True,
     )
 
-    return SuccessOperationUser(
-        msg="You have successfully logged out."
-    )
+    return response
 
 
 @router.post(
@@ -128,21 +245,23 @@ def logout_user(
     response_model_exclude_none=True,
 )
 async def auth_refresh_jwt(
-    response: Response,
-    user: UserSchema = Depends(get_current_auth_user_for_refresh),
+    user: UserProfile = Depends(get_current_auth_user_for_refresh),
 ):
     access_token = create_access_token(user)
+    response = fast_json_response(
+        {"access_token": access_token, "token_type": "Bearer"}
+    )
     response.set_cookie(
         key="access_token",
         value=access_token,
         httponly=True,
         max_age=settings.auth_jwt.access_token_expire_minutes * 60,
     )
-    return TokenInfo(access_token=access_token)
+    return response
 
 
 @router.get("/users/me")
 async def auth_user_check_self_info(
-    user: UserSchema = Depends(get_current_active_auth_user),
+    user: UserProfile = Depends(get_current_active_user_profile),
 ):
-    return {"username": user.username, "email": user.email}
+    return fast_json_response({"username": user.username, "email": user.email})
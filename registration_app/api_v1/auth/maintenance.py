@@ -0,0 +1,133 @@
+"""
+Housekeeping of the auth tables, run by one worker through `scheduler`.
+
+The jobs on `users` walk the table by id, `chunk_size` ids per
+transaction (`UPDATE/DELETE ... WHERE id BETWEEN`), with a pause between
+two: every transaction locks few rows for a short time and writes little
+WAL at once, whatever the size of the table.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.api_v1.auth.crud import (
+    count_users,
+    deactivate_dormant_users,
+    delete_inactive_users,
+    get_user_id_bounds,
+)
+from registration_app.api_v1.auth.revocation import purge_expired_tokens
+from registration_app.core import db_helper
+from registration_app.core.config import settings
+from registration_app.core.metrics import (
+    registry as metrics_registry,
+    scheduled_job_rows,
+    users_count,
+)
+from registration_app.core.scheduler import Scheduler
+from registration_app.core.utils.dates import utc_now
+
+
+log = logging.getLogger(__name__)
+
+config = settings.maintenance
+
+
+async def _for_each_id_range(
+    process: Callable[[AsyncSession, int, int], Awaitable[int]],
+) -> int:
+    """Call `process` on consecutive id ranges of `users`, sum what it returns."""
+    done = 0
+    async with db_helper.session_factory() as session:
+        bounds = await get_user_id_bounds(session)
+        if bounds is None:
+            return done
+
+        first_id, last_id = bounds
+        for low in range(first_id, last_id + 1, config.chunk_size):
+            # every call commits: no connection is held during the pause
+            done += await process(session, low, low + config.chunk_size - 1)
+            await asyncio.sleep(config.chunk_pause)
+
+    return done
+
+
+async def deactivate_dormant_accounts() -> None:
+    seen_before = utc_now() - timedelta(days=config.dormant_after_days)
+
+    async def process(session: AsyncSession, first_id: int, last_id: int) -> int:
+        user_ids = await deactivate_dormant_users(session, first_id, last_id, seen_before)
+        return len(user_ids)
+
+    deactivated = await _for_each_id_range(process)
+    scheduled_job_rows.inc(deactivated, job="deactivate_dormant_accounts")
+    log.info("Deactivated %d dormant accounts", deactivated)
+
+
+async def purge_inactive_accounts() -> None:
+    updated_before = utc_now() - timedelta(days=config.purge_inactive_after_days)
+
+    async def process(session: AsyncSession, first_id: int, last_id: int) -> int:
+        return await delete_inactive_users(session, first_id, last_id, updated_before)
+
+    deleted = await _for_each_id_range(process)
+    scheduled_job_rows.inc(deleted, job="purge_inactive_accounts")
+    log.info("Deleted %d inactive accounts", deleted)
+
+
+async def purge_revoked_tokens() -> None:
+    purged = await purge_expired_tokens(config.chunk_size, config.chunk_pause)
+    scheduled_job_rows.inc(purged, job="purge_revoked_tokens")
+    log.info("Purged %d expired revoked tokens", purged)
+
+
+async def count_accounts() -> None:
+    # counted as dormant by the deactivation job, if it is enabled
+    days = config.dormant_after_days or 0
+    seen_before = utc_now() - timedelta(days=days)
+
+    # a full scan: on a replica when there is one
+    async with db_helper.replica_session() as session:
+        counts = await count_users(session, seen_before)
+
+    users_count.set(counts.total, state="total")
+    users_count.set(counts.active, state="active")
+    if config.dormant_after_days is not None:
+        users_count.set(counts.dormant, state="dormant")
+
+
+scheduler = Scheduler(
+    db=db_helper,
+    lock_key=config.lock_key,
+    poll_interval=config.leader_poll_interval,
+)
+scheduler.add_job(
+    "purge_revoked_tokens",
+    settings.token_revocation.purge_interval,
+    purge_revoked_tokens,
+)
+scheduler.add_job("count_accounts", config.stats_interval, count_accounts)
+if config.dormant_after_days is not None:
+    scheduler.add_job(
+        "deactivate_dormant_accounts",
+        config.housekeeping_interval,
+        deactivate_dormant_accounts,
+    )
+if config.purge_inactive_after_days is not None:
+    scheduler.add_job(
+        "purge_inactive_accounts",
+        config.housekeeping_interval,
+        purge_inactive_accounts,
+    )
+
+
+def _collect_maintenance_metrics() -> None:
+    # the counts of a worker that stopped leading would be summed with
+    # the ones of the new leader
+    if not scheduler.is_leader:
+        users_count.clear()
+
+
+metrics_registry.on_collect(_collect_maintenance_metrics)
@@ -0,0 +1,84 @@
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from fastapi import Form, HTTPException, Request, status
+from registration_app.core.config import settings
+
+
+class RateLimiterBackend(ABC):
+    """Counts hits per key, a shared store (e.g. redis) can implement it too."""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int) -> float | None:
+        """Register a hit, return seconds to wait if the key is over `limit`."""
+
+
+class InMemorySlidingWindowBackend(RateLimiterBackend):
+    """
+    Sliding-window counter: per key only the counts of the current and
+    the previous window are kept, the previous one weighted by its overlap.
+    The least recently used keys are evicted beyond `max_keys`.
+    """
+
+    def __init__(self, window: float, max_keys: int) -> None:
+        self.window = window
+        self.max_keys = max_keys
+        # key -> (window number, hits in it, hits in the previous window)
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int) -> float | None:
+        now = monotonic()
+        current_window = int(now // self.window)
+
+        window, current, previous = self._counters.get(key, (current_window, 0, 0))
+        if window != current_window:
+            previous = current if window == current_window - 1 else 0
+            current = 0
+
+        elapsed = (now % self.window) / self.window
+        estimated = previous * (1 - elapsed) + current
+        if estimated >= limit:
+            self._counters[key] = (current_window, current, previous)
+            self._counters.move_to_end(key)
+            # until enough of the previous window has slid out
+            if previous and current < limit:
+                needed = 1 - (limit - current) / previous
+                return max(needed - elapsed, 0) * self.window
+            return (1 - elapsed) * self.window
+
+        self._counters[key] = (current_window, current + 1, previous)
+        self._counters.move_to_end(key)
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+
+        return None
+
+
+login_limiter_backend: RateLimiterBackend = InMemorySlidingWindowBackend(
+    window=settings.login_throttle.window,
+    max_keys=settings.login_throttle.max_keys,
+)
+
+
+async def throttle_login(
+    request: Request,
+    username: str = Form(),
+) -> None:
+    """Reject `/login` attempts over the limit before the DB and bcrypt."""
+    if not settings.login_throttle.enabled:
+        return
+
+    # behind a reverse proxy run uvicorn with --proxy-headers for real IPs
+    client_ip = request.client.host if request.client else "unknown"
+    for key, limit in (
+        (f"user:{username}", settings.login_throttle.username_limit),
+        (f"ip:{client_ip}", settings.login_throttle.ip_limit),
+    ):
+        retry_after = await login_limiter_backend.hit(key, limit)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="too many login attempts, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
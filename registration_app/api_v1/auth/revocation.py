@@ -0,0 +1,105 @@
+"""
+Revoked refresh tokens.
+
+The `revoked_tokens` table is the source of truth. Every worker keeps a
+Bloom filter of the revoked `jti`s in front of it, so a refresh with a
+token that was never revoked (nearly all of them) is answered without
+the DB; only filter hits are confirmed by a lookup.
+
+The filter is rebuilt on startup and every `purge_interval` seconds, to
+drop the tokens purged by the maintenance job, and the tokens revoked by
+other workers are loaded every `refresh_interval` seconds: until then
+another worker may still accept a token revoked elsewhere. Until the
+first successful load, every check goes to the DB.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.api_v1.auth.bloom_index import BloomIndex
+from registration_app.api_v1.auth.crud import (
+    is_token_revoked,
+    purge_revoked_tokens,
+    revoke_token,
+)
+from registration_app.api_v1.auth.helpers import TOKEN_ID_CLAIM
+from registration_app.core import db_helper
+from registration_app.core.config import settings
+from registration_app.core.metrics import token_revocation_checks
+from registration_app.core.models.revoked_token import RevokedToken
+from registration_app.core.utils.dates import utc_now
+
+
+log = logging.getLogger(__name__)
+
+
+class TokenRevocationStore(BloomIndex[datetime]):
+    # `created_at` is set by the DB when the transaction starts: refreshes
+    # go back a little to cover the ones committed late
+    overlap = timedelta(minutes=1)
+
+    def _statement(self, since: datetime | None) -> Select:
+        stmt = select(RevokedToken.jti, RevokedToken.created_at).where(
+            RevokedToken.expires_at > utc_now()
+        )
+        if since is not None:
+            stmt = stmt.where(RevokedToken.created_at >= since)
+        return stmt
+
+    async def revoke(self, session: AsyncSession, payload: dict) -> None:
+        """Revoke a verified token, tokens without a `jti` can't be revoked."""
+        jti = payload.get(TOKEN_ID_CLAIM)
+        if jti is None:
+            return
+
+        await revoke_token(
+            session,
+            jti=jti,
+            user_id=int(payload["sub"]),
+            expires_at=datetime.fromtimestamp(payload["exp"], UTC).replace(tzinfo=None),
+        )
+        self.add(jti)
+
+    async def is_revoked(self, session: AsyncSession, jti: str) -> bool:
+        if self.loaded and jti not in self.bloom:
+            token_revocation_checks.inc(result="not_revoked")
+            return False
+
+        revoked = await is_token_revoked(session, jti)
+        token_revocation_checks.inc(result="revoked" if revoked else "false_positive")
+        return revoked
+
+
+revocation_store = TokenRevocationStore(
+    name="revoked_tokens",
+    capacity=settings.token_revocation.bloom_capacity,
+    error_rate=settings.token_revocation.bloom_error_rate,
+)
+
+
+async def load_revocation_store() -> None:
+    await revocation_store.load_once(db_helper.session_factory)
+
+
+async def maintain_revocation_store() -> None:
+    await revocation_store.maintain(
+        db_helper.session_factory,
+        refresh_interval=settings.token_revocation.refresh_interval,
+        # drops the tokens purged by the maintenance job
+        rebuild_interval=settings.token_revocation.purge_interval,
+    )
+
+
+async def purge_expired_tokens(batch_size: int, pause: float) -> int:
+    """Delete the expired revoked tokens, `batch_size` per transaction."""
+    purged = 0
+    expired_before = utc_now()
+    async with db_helper.session_factory() as session:
+        while True:
+            deleted = await purge_revoked_tokens(session, expired_before, batch_size)
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+            await asyncio.sleep(pause)
@@ -0,0 +1,57 @@
+"""
+Lookup statements of the auth tables, built once at import time.
+
+Every statement takes its values through bind parameters, so the same
+object is executed on every call: it is never rebuilt, its cache key
+is stable and the engine's compiled cache is hit after the first call.
+"""
+
+from sqlalchemy import bindparam, select
+from registration_app.core.models.revoked_token import RevokedToken
+from registration_app.core.models.user import User
+
+
+# what `/login` needs to check the password and issue tokens
+LOGIN_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.hashed_password,
+    User.is_active,
+    User.credential_version,
+    User.last_login_at,
+)
+
+# what an authenticated request needs, never the password hash
+PROFILE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.is_active,
+    User.credential_version,
+)
+
+select_login_by_username = (
+    select(*LOGIN_COLUMNS)
+    .where(User.username == bindparam("username"))
+)
+
+select_profile_by_id = (
+    select(*PROFILE_COLUMNS)
+    .where(User.id == bindparam("user_id"))
+)
+
+select_password_by_id = (
+    select(User.hashed_password)
+    .where(User.id == bindparam("user_id"))
+)
+
+select_user_id_by_username = (
+    select(User.id)
+    .where(User.username == bindparam("username"))
+)
+
+select_revoked_token_by_jti = (
+    select(RevokedToken.jti)
+    .where(RevokedToken.jti == bindparam("jti"))
+)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from registration_app.core.config import settings
+from registration_app.core.metrics import track_cache, track_single_flight
+from registration_app.core.schemas.user import UserProfile
+from registration_app.core.utils.single_flight import SingleFlight
+from registration_app.core.utils.ttl_cache import TTLCache
+
+
+# authenticated users by id, filled by `validation.get_user_by_token_sub`
+# and invalidated by the `crud` functions that change a user, see `forget_user`
+user_cache: TTLCache[int, UserProfile] = TTLCache(
+    maxsize=settings.user_cache.maxsize,
+    ttl=settings.user_cache.ttl,
+)
+track_cache("users", user_cache)
+
+# DB lookups of the users missing from the cache: concurrent requests of
+# the same user (parallel calls of a page, client retries) share one
+user_lookups: SingleFlight[tuple, UserProfile | None] = SingleFlight()
+track_single_flight("user_lookups", user_lookups)
+
+
+# generation of the users changed lately, bumped by `forget_user`: a lookup
+# caches what it read only if the generation it started with is still the
+# current one. Bounded like the cache, the users forgotten longest ago
+# share `_evicted_generation`, which is only ever too high (a lookup then
+# doesn't cache, it is never stale)
+_generations: OrderedDict[int, int] = OrderedDict()
+_evicted_generation = 0
+_last_generation = 0
+
+
+def user_generation(user_id: int) -> int:
+    """To be taken before reading the user, for `cache_user`."""
+    return _generations.get(user_id, _evicted_generation)
+
+
+def cache_user(user: UserProfile, generation: int) -> None:
+    """Cache a user read from the DB, unless it changed since `generation`."""
+    if user_generation(user.id) == generation:
+        user_cache.set(user.id, user)
+
+
+def _bump_generation(user_id: int) -> None:
+    global _evicted_generation, _last_generation
+
+    _last_generation += 1
+    _generations[user_id] = _last_generation
+    _generations.move_to_end(user_id)
+    while len(_generations) > max(settings.user_cache.maxsize, 1):
+        _, generation = _generations.popitem(last=False)
+        _evicted_generation = max(_evicted_generation, generation)
+
+
+def forget_user(user_id: int) -> None:
+    """Drop what is known about a user that just changed."""
+    user_cache.pop(user_id)
+    # the lookups in flight read the user before the change
+    _bump_generation(user_id)
+    # lookups started before the change must not answer the later requests
+    for on_replica in (False, True):
+        user_lookups.forget((user_id, on_replica))
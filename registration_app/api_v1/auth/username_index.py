@@ -0,0 +1,71 @@
+"""
+Taken usernames.
+
+Every worker keeps a Bloom filter of the usernames in `users`, so the
+usual question, "is this name free?", is answered without the DB. A hit
+may be a false positive and is confirmed by a lookup. The unique
+constraint of the table stays the final authority: a name registered
+meanwhile by another worker is still rejected by the INSERT.
+
+The filter is loaded on startup by streaming the table, updated by the
+registrations of this worker, and extended every `refresh_interval`
+seconds with the users registered by the other ones. Until the first
+successful load, every check goes to the DB.
+"""
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from registration_app.api_v1.auth.bloom_index import BloomIndex
+from registration_app.api_v1.auth.crud import is_username_taken
+from registration_app.core import db_helper
+from registration_app.core.config import settings
+from registration_app.core.metrics import username_index_checks
+from registration_app.core.models.user import User
+
+
+class UsernameIndex(BloomIndex[int]):
+    # ids are taken when a transaction inserts, not when it commits:
+    # refreshes go back a little to catch the ones committed late
+    overlap = 1_000
+
+    def _statement(self, since: int | None) -> Select:
+        stmt = select(User.username, User.id)
+        if since is not None:
+            stmt = stmt.where(User.id > since)
+        return stmt
+
+    def is_free(self, username: str) -> bool:
+        """True if the filter rules the name out, False: ask `confirm_taken`."""
+        if self.loaded and username not in self.bloom:
+            username_index_checks.inc(result="free")
+            return True
+        return False
+
+    async def confirm_taken(self, session: AsyncSession, username: str) -> bool:
+        taken = await is_username_taken(session, username)
+        username_index_checks.inc(result="taken" if taken else "false_positive")
+        return taken
+
+    async def is_taken(self, session: AsyncSession, username: str) -> bool:
+        if self.is_free(username):
+            return False
+        return await self.confirm_taken(session, username)
+
+
+username_index = UsernameIndex(
+    name="usernames",
+    capacity=settings.username_index.capacity,
+    error_rate=settings.username_index.error_rate,
+)
+
+
+async def load_username_index() -> None:
+    await username_index.load_once(db_helper.session_factory)
+
+
+async def maintain_username_index() -> None:
+    """Load the users registered by the other workers, until cancelled."""
+    await username_index.maintain(
+        db_helper.session_factory,
+        refresh_interval=settings.username_index.refresh_interval,
+    )
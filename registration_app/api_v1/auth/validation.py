@@ -1,16 +1,29 @@
+from contextlib import AbstractAsyncContextManager
+from typing import Awaitable, Callable
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from jwt import InvalidTokenError
 from fastapi import status, Request
 from registration_app.core import db_helper
+from registration_app.core.config import settings
 from registration_app.api_v1.auth.crud import get_user_by_id
 from registration_app.api_v1.auth.helpers import (
     TOKEN_TYPE_FIELD,
     ACCESS_TOKEN_TYPE,
     REFRESH_TOKEN_TYPE,
+    ACTIVE_CLAIM,
+    CREDENTIAL_VERSION_CLAIM,
+    TOKEN_ID_CLAIM,
 )
-from registration_app.api_v1.auth_crypto import utils as auth_utils
-from registration_app.core.schemas.user import UserSchema
+from registration_app.api_v1.auth.revocation import revocation_store
+from registration_app.api_v1.auth.user_cache import (
+    cache_user,
+    user_cache,
+    user_generation,
+    user_lookups,
+)
+from registration_app.api_v1.auth_crypto.token_cache import decode_jwt_cached
+from registration_app.core.schemas.user import UserProfile
 
 
 async def get_access_jwt_from_cookie(
@@ -43,7 +56,7 @@ async def get_current_token_payload_access(
     token: str = Depends(get_access_jwt_from_cookie)
 ) -> dict:
     try:
-        payload = auth_utils.decode_jwt(token)
+        payload = decode_jwt_cached(token)
     except InvalidTokenError as ex:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,9 +68,9 @@ async def get_current_token_payload_access(
 
 async def get_current_token_payload_refresh(
     token: str = Depends(get_refresh_jwt_from_cookie)
-) -> UserSchema:
+) -> dict:
     try:
-        payload = auth_utils.decode_jwt(token)
+        payload = decode_jwt_cached(token)
     except InvalidTokenError as ex:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,6 +80,25 @@ async def get_current_token_payload_refresh(
     return payload
 
 
+async def get_optional_token_payload_refresh(
+    request: Request
+) -> dict | None:
+    """Payload of a valid refresh token cookie, None without one."""
+    refresh_token = request.cookies.get(f"{REFRESH_TOKEN_TYPE}_token")
+    if not refresh_token:
+        return None
+
+    try:
+        payload = decode_jwt_cached(refresh_token)
+    except InvalidTokenError:
+        return None
+
+    if payload.get(TOKEN_TYPE_FIELD) != REFRESH_TOKEN_TYPE:
+        return None
+
+    return payload
+
+
 def validate_token_type(payload: dict, token_type: str) -> bool:
     current_token_type = payload.get(TOKEN_TYPE_FIELD)
     if current_token_type == token_type:
@@ -78,15 +110,62 @@ def validate_token_type(payload: dict, token_type: str) -> bool:
     )
 
 
-async def get_user_by_token_sub(
-    payload: dict,
-    session: AsyncSession
-) -> UserSchema:
-    user_id: str = payload.get("sub")
+def validate_credential_version(payload: dict, user: UserProfile) -> bool:
+    if payload.get(CREDENTIAL_VERSION_CLAIM) == user.credential_version:
+        return True
 
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="token is outdated, please log in again",
+    )
+
+
+def get_user_from_claims(payload: dict) -> UserProfile:
+    try:
+        return UserProfile(
+            id=int(payload["sub"]),
+            username=payload["username"],
+            email=payload["email"],
+            is_active=payload[ACTIVE_CLAIM],
+            credential_version=payload[CREDENTIAL_VERSION_CLAIM],
+        )
+    except (KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token has no user claims, please log in again",
+        )
+
+
+async def _lookup_user(
+    user_id: int,
+    session: AsyncSession,
+    fill_cache: bool,
+) -> UserProfile | None:
+    generation = user_generation(user_id)
     user = await get_user_by_id(session, user_id)
-    if user:
-        return UserSchema.model_validate(user)
+    if user is None:
+        return None
+
+    user_profile = UserProfile.from_row(user)
+    if fill_cache:
+        cache_user(user_profile, generation)
+    return user_profile
+
+
+async def _get_user(
+    user_id: int,
+    on_replica: bool,
+    lookup: Callable[[], Awaitable[UserProfile | None]],
+) -> UserProfile:
+    """The cached user, or the one `lookup` reads, shared by concurrent calls."""
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
+    # replica lookups are never shared with the ones on the primary
+    user_profile = await user_lookups.do((user_id, on_replica), lookup)
+    if user_profile is not None:
+        return user_profile
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,20 +173,98 @@ async def get_user_by_token_sub(
     )
 
 
+async def get_user_by_token_sub(
+    payload: dict,
+    session: AsyncSession,
+) -> UserProfile:
+    user_id = int(payload.get("sub"))
+
+    return await _get_user(
+        user_id,
+        on_replica=False,
+        lookup=lambda: _lookup_user(user_id, session, fill_cache=True),
+    )
+
+
 async def get_current_auth_user(
     payload: dict = Depends(get_current_token_payload_access),
     session: AsyncSession = Depends(db_helper.session_getter)
-) -> UserSchema:
+) -> UserProfile:
 
     validate_token_type(payload, ACCESS_TOKEN_TYPE)
 
-    return await get_user_by_token_sub(payload, session)
+    user = await get_user_by_token_sub(payload, session)
+    if settings.auth_jwt.stateless_access:
+        # the claims of this token may already be served without the DB
+        validate_credential_version(payload, user)
+
+    return user
+
+
+async def get_replica_auth_user(
+    payload: dict = Depends(get_current_token_payload_access),
+    replica_session: Callable[[], AbstractAsyncContextManager[AsyncSession]] = Depends(
+        db_helper.replica_sessions_getter
+    ),
+) -> UserProfile:
+    """
+    `get_current_auth_user` for read-only endpoints: from the cache, else
+    from a replica, connected to only on a cache miss.
+    """
+    validate_token_type(payload, ACCESS_TOKEN_TYPE)
+    user_id = int(payload.get("sub"))
+
+    async def lookup() -> UserProfile | None:
+        async with replica_session() as session:
+            # a lagging replica may still return the user as it was before
+            # a change: it must not end up in the cache read by the other
+            # endpoints. The primary (no replica up or configured) may
+            return await _lookup_user(
+                user_id,
+                session,
+                fill_cache="replica" not in session.info,
+            )
+
+    return await _get_user(
+        user_id,
+        on_replica=bool(settings.db.replica_urls),
+        lookup=lookup,
+    )
+
+
+async def get_current_token_user(
+    payload: dict = Depends(get_current_token_payload_access),
+) -> UserProfile:
+    validate_token_type(payload, ACCESS_TOKEN_TYPE)
+
+    return get_user_from_claims(payload)
 
 
 async def get_current_auth_user_for_refresh(
     payload: dict = Depends(get_current_token_payload_refresh),
     session: AsyncSession = Depends(db_helper.session_getter)
-) -> UserSchema:
+) -> UserProfile:
     validate_token_type(payload, REFRESH_TOKEN_TYPE)
 
-    return await get_user_by_token_sub(payload, session)
+    # tokens issued before `jti` was added can't be revoked
+    jti = payload.get(TOKEN_ID_CLAIM)
+    if jti is not None and await revocation_store.is_revoked(session, jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token has been revoked, please log in again",
+        )
+
+    user = await get_user_by_token_sub(payload, session)
+    # the access token is built from the current row: without this check
+    # a refresh token would outlive the change of password
+    validate_credential_version(payload, user)
+
+    return user
+
+
+# read-only endpoints: verified token claims in stateless mode, the DB otherwise
+get_current_user_profile = (
+    get_current_token_user
+    if settings.auth_jwt.stateless_access
+    else get_replica_auth_user
+)
@@ -1,72 +1,212 @@
 from registration_app.core.config import settings
 from registration_app.core.schemas.user import (
+    BatchRegistrationResult,
+    BatchUserResult,
     CreateUser,
+    RegisteredUser,
     SuccessOperationUser,
-    UserSchema,
+    UserProfile,
     UserChangePassword,
 )
-from registration_app.api_v1.auth_crypto.utils import validate_password
-from fastapi import APIRouter, Depends, Form, HTTPException, status
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
+from contextlib import AbstractAsyncContextManager
+from typing import Callable
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from registration_app.core import db_helper
-from .crud import create_user, update_user_password, deactivate_user_account
-from .jwt_auth import get_current_active_auth_user
+from registration_app.core.responses import fast_json_response
+from registration_app.api_v1.admin.security import require_admin_key
+from .batch import iter_batch_rows
+from .crud import (
+    create_user,
+    create_users,
+    get_user_password_hash,
+    update_user_password,
+    deactivate_user_account,
+)
+from .jwt_auth import get_current_active_auth_user, issue_tokens_response
+from registration_app.api_v1.auth.username_index import username_index
 
 router = APIRouter(prefix=settings.api.v1.auth, tags=["User DB"])
 
+exception_user_not_found = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="user not found",
+)
+
 
-@router.post("/register", response_model=SuccessOperationUser)
+@router.post(
+    "/register",
+    response_model=RegisteredUser,
+    response_model_exclude_none=True,
+)
 async def basic_register(
     session: AsyncSession = Depends(db_helper.session_getter),
     user: CreateUser = Form(),
 ):
-    await create_user(session, user)
+    # rejects taken names before paying for the password hash
+    if await username_index.is_taken(session, user.username):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username already exists.",
+        )
+
+    created = await create_user(session, user)
+    username_index.add(user.username)
+
+    content = {
+        "msg": "User created successfully!",
+        "username": created.username,
+        "email": created.email,
+    }
+    if settings.registration.issue_tokens:
+        # the inserted row is all the tokens need: no login round trip
+        return issue_tokens_response(UserProfile.from_row(created), content)
+
+    return fast_json_response(content)
+
+
+@router.get("/username_available")
+async def username_available(
+    username: str = Query(..., min_length=3, max_length=30),
+    replica_session: Callable[[], AbstractAsyncContextManager[AsyncSession]] = Depends(
+        db_helper.replica_sessions_getter
+    ),
+):
+    """
+    Whether the username can be registered. A free name may still be taken
+    by a concurrent or very recent registration (the lookup may go to a
+    replica), `/register` has the final word.
+    """
+    # most names are ruled out by the filter, without a connection
+    taken = False
+    if not username_index.is_free(username):
+        async with replica_session() as session:
+            taken = await username_index.confirm_taken(session, username)
+
+    return fast_json_response({"username": username, "available": not taken})
+
+
+@router.post(
+    "/register/batch",
+    response_model=BatchRegistrationResult,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_admin_key)],
+)
+async def batch_register(
+    request: Request,
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    """
+    Register many users at once from a JSON array or an NDJSON stream
+    (`Content-Type: application/x-ndjson`) of `CreateUser` objects.
+    Existing usernames are reported as conflicts, not errors.
+    Admin only, `X-Admin-Key` as for the admin endpoints.
+
+    Chunks are committed one by one: when one fails (413 past the limits,
+    503 from the hasher...) the response has the status of the failure,
+    the results of the rows committed before it and `committed_rows`.
+    """
+    result = BatchRegistrationResult()
+    error_status = status.HTTP_200_OK
+
+    try:
+        async for chunk in iter_batch_rows(
+            request,
+            chunk_size=settings.registration.batch_chunk_size,
+            max_rows=settings.registration.batch_max_rows,
+            max_body_size=settings.registration.batch_max_body_size,
+        ):
+            users = [user for _, user in chunk if isinstance(user, CreateUser)]
+            created = await create_users(session, users) if users else set()
+            for username in created:
+                username_index.add(username)
+
+            for row, user in chunk:
+                if isinstance(user, BatchUserResult):
+                    result.invalid += 1
+                    result.results.append(user)
+                    continue
+
+                # a username repeated inside the batch is created only once
+                if user.username in created:
+                    created.discard(user.username)
+                    result.created += 1
+                    row_status = "created"
+                else:
+                    result.conflicted += 1
+                    row_status = "conflict"
+
+                result.results.append(
+                    BatchUserResult(row=row, username=user.username, status=row_status)
+                )
+            result.committed_rows += len(chunk)
+
+    except HTTPException as ex:
+        # nothing is done yet: a plain error
+        if not result.committed_rows:
+            raise
+
+        error_status = ex.status_code
+        result.error = str(ex.detail)
 
-    return SuccessOperationUser(
-        msg="User created successfully!",
-        username=user.username,
-        email=user.email,
+    # the results are built by us, no need to validate them again
+    return fast_json_response(
+        result.model_dump(exclude_none=True),
+        status_code=error_status,
     )
 
 
 @router.patch("/change_password", response_model=SuccessOperationUser)
 async def change_password(
     passwords_data: UserChangePassword,
-    user: UserSchema = Depends(get_current_active_auth_user),
+    user: UserProfile = Depends(get_current_active_auth_user),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
+    hashed_password = await get_user_password_hash(session, user.id)
+    if hashed_password is None:
+        raise exception_user_not_found
 
-    if not validate_password(
+    if not await password_hasher.validate_password(
         passwords_data.current_password,
-        user.hashed_password,
+        hashed_password,
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect.",
         )
 
-    await update_user_password(
+    updated = await update_user_password(
         session,
         user.id,
         passwords_data.new_password,
     )
+    # deleted between the lookup and the update
+    if updated is None:
+        raise exception_user_not_found
 
-    return SuccessOperationUser(
-        msg="Password updated successfully!",
-        username=user.username,
-        email=user.email,
+    return fast_json_response(
+        {
+            "msg": "Password updated successfully!",
+            "username": updated.username,
+            "email": updated.email,
+        }
     )
 
 
 @router.delete("/deactivate_user_account", response_model=SuccessOperationUser)
 async def delete_account(
-    user: UserSchema = Depends(get_current_active_auth_user),
+    user: UserProfile = Depends(get_current_active_auth_user),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    await deactivate_user_account(session, user.id)
+    deactivated = await deactivate_user_account(session, user.id)
+    if deactivated is None:
+        raise exception_user_not_found
 
-    return SuccessOperationUser(
-        msg=f"User deleted successfully!",
-        username=user.username,
-        email=user.email,
+    return fast_json_response(
+        {
+            "msg": "User deleted successfully!",
+            "username": deactivated.username,
+            "email": deactivated.email,
+        }
     )
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from time import perf_counter
+from fastapi import FastAPI
+from sqlalchemy import text
+from registration_app.api_v1.auth.statements import (
+    select_login_by_username,
+    select_password_by_id,
+    select_profile_by_id,
+)
+from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
+from registration_app.core import db_helper
+
+
+log = logging.getLogger(__name__)
+
+WARMUP_PASSWORD = "warm-up-password"
+
+
+async def _warm_up_connections(connections: int) -> None:
+    # all connections are held at once, otherwise the pool would reuse one
+    connections = min(connections, db_helper.engine.pool.size())
+    if connections <= 0:
+        return
+
+    barrier = asyncio.Barrier(connections)
+
+    async def open_connection() -> None:
+        async with db_helper.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            # compiled once by SQLAlchemy, prepared on every connection
+            await conn.execute(select_profile_by_id, {"user_id": 0})
+            await conn.execute(select_login_by_username, {"username": ""})
+            await conn.execute(select_password_by_id, {"user_id": 0})
+            await barrier.wait()
+
+    # a failing connection cancels the others still waiting at the barrier
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(connections):
+            task_group.create_task(open_connection())
+
+
+async def _warm_up_crypto() -> None:
+    token = auth_utils.encode_jwt({"sub": "0"})
+    auth_utils.decode_jwt(token)
+
+    # also starts the hashing pool workers
+    hashed_password = await password_hasher.hash_password(WARMUP_PASSWORD)
+    await password_hasher.validate_password(WARMUP_PASSWORD, hashed_password.decode())
+
+
+async def _warm_up_schemas(app: FastAPI) -> None:
+    # builds the JSON schemas of every request and response model
+    app.openapi()
+
+
+async def warm_up(
+        app: FastAPI,
+        connections: int,
+        timeout: float,
+) -> dict[str, float]:
+    """
+    Pay the first-request costs before the worker accepts traffic.
+    Returns the duration of every step in seconds; failing steps are logged.
+    """
+    steps = {
+        "db_connections": lambda: _warm_up_connections(connections),
+        "crypto": _warm_up_crypto,
+        "schemas": lambda: _warm_up_schemas(app),
+    }
+
+    durations = {}
+    start = perf_counter()
+    for name, step in steps.items():
+        step_start = perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                await step()
+        except Exception:
+            log.exception("Warm-up step %r failed", name)
+        durations[name] = round(perf_counter() - step_start, 3)
+
+    durations["total"] = round(perf_counter() - start, 3)
+    log.info("Worker warmed up in %.3fs: %s", durations["total"], durations)
+    return durations
@@ -0,0 +1,32 @@
+import argparse
+from pathlib import Path
+from typing import get_args
+from registration_app.api_v1.auth_crypto.keys import JWTAlgorithm, write_key_pair
+from registration_app.core.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a JWT key pair.")
+    parser.add_argument(
+        "--algorithm",
+        choices=get_args(JWTAlgorithm),
+        default=settings.auth_jwt.algorithm,
+    )
+    parser.add_argument(
+        "--private-key",
+        type=Path,
+        default=settings.auth_jwt.private_key_path,
+    )
+    parser.add_argument(
+        "--public-key",
+        type=Path,
+        default=settings.auth_jwt.public_key_path,
+    )
+    args = parser.parse_args()
+
+    write_key_pair(args.algorithm, args.private_key, args.public_key)
+    print(f"{args.algorithm} key pair written to {args.private_key} and {args.public_key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure bcrypt on this machine and suggest the cost factor whose
+hashing time stays within a latency budget:
+
+    python -m registration_app.api_v1.auth_crypto.calibrate --target-ms 250
+
+Run it on the hardware the app is deployed on, with the same number of
+hashing workers busy (`--parallel`), then set the suggested value as
+`APP_CONFIG__HASHING__BCRYPT_ROUNDS`. Existing hashes are upgraded or
+downgraded on the next login of each user.
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from registration_app.api_v1.auth_crypto.utils import hash_password
+from registration_app.core.config import settings
+
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+PASSWORD = "calibration-password"
+
+
+def measure_ms(rounds: int, samples: int, parallel: int) -> float:
+    """Median milliseconds per hash, with `parallel` hashes at once."""
+
+    def timed_hash(_) -> float:
+        start = time.perf_counter()
+        hash_password(PASSWORD, rounds)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        durations = list(executor.map(timed_hash, range(samples * parallel)))
+
+    return statistics.median(durations)
+
+
+def calibrate(target_ms: float, samples: int, parallel: int) -> tuple[int, dict[int, float]]:
+    measured = {}
+    suggested = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        measured[rounds] = measure_ms(rounds, samples, parallel)
+        if measured[rounds] > target_ms:
+            break
+        suggested = rounds
+
+    return suggested, measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=5, help="hashes per cost")
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=settings.hashing.max_workers,
+        help="hashes running at once, as in the hashing pool",
+    )
+    args = parser.parse_args()
+
+    suggested, measured = calibrate(args.target_ms, args.samples, args.parallel)
+    for rounds, ms in measured.items():
+        marker = "  <- suggested" if rounds == suggested else ""
+        print(f"rounds={rounds:<3} {ms:9.1f} ms{marker}")
+
+    print(f"\ncurrent:   APP_CONFIG__HASHING__BCRYPT_ROUNDS={settings.hashing.bcrypt_rounds}")
+    print(f"suggested: APP_CONFIG__HASHING__BCRYPT_ROUNDS={suggested}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, TypeVar
+from fastapi import HTTPException, status
+from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.core.config import settings
+from registration_app.core.metrics import password_hashing_duration
+
+
+T = TypeVar("T")
+
+exception_hashing_overloaded = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Server is busy, please try again later.",
+    headers={"Retry-After": "1"},
+)
+
+
+def _timed(func: Callable[..., T], *args) -> tuple[T, float]:
+    # runs inside the pool, so the duration excludes the time spent queued
+    start = time.perf_counter()
+    return func(*args), time.perf_counter() - start
+
+
+class PasswordHasher:
+    """Runs bcrypt in a worker pool so it never blocks the event loop."""
+
+    def __init__(
+            self,
+            executor: Literal["thread", "process"] = "thread",
+            max_workers: int = 4,
+            max_pending: int = 64,
+            rounds: int = 12,
+    ) -> None:
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self._executor: Executor | None = None
+        self._pid: int | None = None
+
+    @property
+    def executor(self) -> Executor:
+        # created lazily and per process: pools must not cross a gunicorn fork
+        if self._executor is None or self._pid != os.getpid():
+            executor_cls = (
+                ProcessPoolExecutor
+                if self.executor_kind == "process"
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_cls(max_workers=self.max_workers)
+            self._pid = os.getpid()
+
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., T], *args) -> T:
+        # the bounded queue: jobs running in the pool plus jobs waiting for it
+        if self.pending >= self.max_workers + self.max_pending:
+            raise exception_hashing_overloaded
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, duration = await loop.run_in_executor(
+                self.executor,
+                _timed,
+                func,
+                *args,
+            )
+        finally:
+            self.pending -= 1
+
+        password_hashing_duration.observe(duration, operation=operation)
+        return result
+
+    async def hash_password(self, password: str) -> bytes:
+        return await self._run(
+            "hash",
+            auth_utils.hash_password,
+            password,
+            self.rounds,
+        )
+
+    async def hash_passwords(self, passwords: list[str]) -> list[bytes]:
+        # in waves of `max_workers`, so logins queued meanwhile are not
+        # stuck behind a whole batch in the pool
+        hashed = []
+        for start in range(0, len(passwords), self.max_workers):
+            wave = passwords[start:start + self.max_workers]
+            hashed += await asyncio.gather(
+                *(self.hash_password(password) for password in wave)
+            )
+
+        return hashed
+
+    async def validate_password(self, password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify",
+            auth_utils.validate_password,
+            password,
+            hashed_password,
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return auth_utils.get_hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.hashing.executor,
+    max_workers=settings.hashing.max_workers,
+    max_pending=settings.hashing.max_pending,
+    rounds=settings.hashing.bcrypt_rounds,
+)
@@ -0,0 +1,60 @@
+"""
+Loading and generation of JWT signing keys.
+
+A key pair for any supported algorithm can be generated with:
+
+    python -m registration_app.api_v1.auth_crypto --algorithm EdDSA
+"""
+
+from pathlib import Path
+from typing import Literal
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+
+
+JWTAlgorithm = Literal["RS256", "ES256", "EdDSA"]
+
+
+def load_private_key(path: Path) -> PrivateKeyTypes:
+    return serialization.load_pem_private_key(path.read_bytes(), password=None)
+
+
+def load_public_key(path: Path) -> PublicKeyTypes:
+    return serialization.load_pem_public_key(path.read_bytes())
+
+
+def generate_private_key(algorithm: JWTAlgorithm) -> PrivateKeyTypes:
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+
+    raise ValueError(f"Unsupported JWT algorithm {algorithm!r}")
+
+
+def write_key_pair(
+        algorithm: JWTAlgorithm,
+        private_key_path: Path,
+        public_key_path: Path,
+) -> None:
+    key = generate_private_key(algorithm)
+
+    private_key_path.write_bytes(
+        key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+    public_key_path.write_bytes(
+        key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
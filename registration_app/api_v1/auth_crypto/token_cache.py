@@ -0,0 +1,33 @@
+import hashlib
+from time import time
+from registration_app.api_v1.auth_crypto import utils as auth_utils
+from registration_app.core.config import settings
+from registration_app.core.metrics import track_cache
+from registration_app.core.utils.ttl_cache import TTLCache
+
+
+# sha256 of a token -> its verified payload, every entry lives until `exp`
+verified_tokens: TTLCache[bytes, dict] = TTLCache(
+    maxsize=settings.auth_jwt.verified_token_cache_size,
+    ttl=0,
+)
+track_cache("verified_tokens", verified_tokens)
+
+
+def decode_jwt_cached(token: str | bytes) -> dict:
+    """`decode_jwt` paying the signature check once per token and worker."""
+    if isinstance(token, str):
+        token = token.encode()
+
+    key = hashlib.sha256(token).digest()
+    payload = verified_tokens.get(key)
+    if payload is not None:
+        return payload
+
+    payload = auth_utils.decode_jwt(token)
+
+    ttl = payload.get("exp", 0) - time()
+    if ttl > 0:
+        verified_tokens.set(key, payload, ttl=ttl)
+
+    return payload
@@ -1,12 +1,33 @@
 import bcrypt
 import jwt
+from functools import cache
 from datetime import timedelta, datetime, UTC
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+from registration_app.api_v1.auth_crypto.keys import (
+    load_private_key,
+    load_public_key,
+)
 from registration_app.core.config import settings
+from registration_app.core.metrics import jwt_duration
+
+
+# parsed once per process, PyJWT would parse PEM text again on every call
+@cache
+def get_private_key() -> PrivateKeyTypes:
+    return load_private_key(settings.auth_jwt.private_key_path)
+
+
+@cache
+def get_public_key() -> PublicKeyTypes:
+    return load_public_key(settings.auth_jwt.public_key_path)
 
 
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.auth_jwt.private_key_path.read_text(),
+        private_key: PrivateKeyTypes | str | None = None,
         algorithm: str = settings.auth_jwt.algorithm,
         expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
         expire_timedelta: timedelta | None = None,
@@ -23,25 +44,43 @@ def encode_jwt(
         iat=now,
     )
 
-    encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
+    with jwt_duration.time(operation="sign"):
+        encoded = jwt.encode(
+            to_encode,
+            private_key or get_private_key(),
+            algorithm=algorithm,
+        )
     return encoded
 
 
 def decode_jwt(
         token: str | bytes,
-        public_key: str = settings.auth_jwt.public_key_path.read_text(),
+        public_key: PublicKeyTypes | str | None = None,
         algorithm=settings.auth_jwt.algorithm
 ):
-    decoded = jwt.decode(token, public_key, algorithms=[algorithm])
+    with jwt_duration.time(operation="verify"):
+        decoded = jwt.decode(
+            token,
+            public_key or get_public_key(),
+            algorithms=[algorithm],
+        )
     return decoded
 
 
-def hash_password(password: str) -> bytes:
-    solt = bcrypt.gensalt()
+def hash_password(
+        password: str,
+        rounds: int = settings.hashing.bcrypt_rounds,
+) -> bytes:
+    solt = bcrypt.gensalt(rounds)
     pwd_bytes: bytes = password.encode()
     return bcrypt.hashpw(pwd_bytes, solt)
 
 
+def get_hash_rounds(hashed_password: str) -> int:
+    # "$2b$<rounds>$<salt and hash>"
+    return int(hashed_password.split("$")[2])
+
+
 def validate_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         password.encode(),
@@ -1,7 +1,9 @@
 __all__ = (
     "User",
+    "RevokedToken",
     "db_helper",
 )
 
 from .models.db_helper import db_helper
-from .models.user import User
\ No newline at end of file
+from .models.user import User
+from .models.revoked_token import RevokedToken
\ No newline at end of file
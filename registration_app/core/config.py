@@ -1,6 +1,6 @@
 from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import BaseModel, PostgresDsn
+from pydantic import BaseModel, Field, PostgresDsn, SecretStr
 from pathlib import Path
 
 
@@ -11,8 +11,21 @@ LOG_DEFAULT_FORMAT = "[%(asctime)s.%(msecs)03d] %(module)10s:%(lineno)-3d %(leve
 class RunConfig(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8000
-    workers: int = 1
+    # "auto": one worker per available CPU. Every worker has its own DB
+    # pools: up to (db.pool_size + db.max_overflow) * (1 + len(db.replica_urls))
+    # connections, plus one for the maintenance scheduler. Size them so that
+    # workers * that stays below postgres `max_connections` (100 by default)
+    workers: int | Literal["auto"] = 1
     timeout: int = 900
+    # "auto" picks uvloop / httptools when they are installed
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    # load the app, keys and settings once in the master, before fork
+    preload_app: bool = True
+    keepalive: int = 5
+    # restart a worker after max_requests (+ random jitter) requests, 0 - never
+    max_requests: int = 0
+    max_requests_jitter: int = 0
 
 
 class LoggingConfig(BaseModel):
@@ -24,6 +37,26 @@ class LoggingConfig(BaseModel):
         "critical",
     ] = "info"
     log_format: str = LOG_DEFAULT_FORMAT
+    # JSON lines instead of `log_format`
+    structured: bool = True
+    # share of the successful requests written to the access log
+    access_log_sample_rate: float = 1.0
+
+
+class WarmupConfig(BaseModel):
+    # done by every worker in the lifespan, before it accepts requests
+    enabled: bool = True
+    db_connections: int = 5
+    # per warm-up step
+    timeout: float = 10.0
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True
+    # shared by all gunicorn workers, required to aggregate across them
+    multiproc_dir: Path | None = None
+    # how often every worker dumps its metrics there
+    flush_interval: float = 5.0
 
 
 class DatabaseConfig(BaseModel):
@@ -32,6 +65,19 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    # per worker, see `RunConfig.workers` for the total
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = False
+    # asyncpg only: SQLAlchemy's and asyncpg's own prepared statement caches,
+    # set both to 0 behind pgbouncer in transaction mode
+    prepared_statement_cache_size: int = 100
+    statement_cache_size: int = 100
+    # read replicas for the lookups that tolerate replication lag, with the
+    # pool settings above each; without any every query goes to `url`
+    replica_urls: list[PostgresDsn] = []
+    # a replica that fails is left out of the rotation for this long
+    replica_retry_interval: float = 30.0
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -42,9 +88,99 @@ class DatabaseConfig(BaseModel):
     }
 
 
+class HashingConfig(BaseModel):
+    # "thread" is enough for bcrypt (it releases the GIL),
+    # "process" isolates hashing from the worker completely
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int = 4
+    # hashing jobs allowed to wait for a free worker, beyond that -> 503
+    max_pending: int = 64
+    # bcrypt cost factor, each +1 doubles the hashing time;
+    # see `python -m registration_app.api_v1.auth_crypto.calibrate`
+    bcrypt_rounds: int = Field(12, ge=4, le=31)
+    # hashes with another cost are replaced on the next successful login
+    rehash_on_login: bool = True
+
+
+class RegistrationConfig(BaseModel):
+    # users hashed and inserted together by `/register/batch`
+    batch_chunk_size: int = 500
+    # larger `/register/batch` bodies are rejected with 413
+    batch_max_rows: int = 10_000
+    batch_max_body_size: int = 10 * 1024 * 1024
+    # `/register` logs the new user in: tokens and cookies as from `/login`
+    issue_tokens: bool = False
+
+
+class LoginThrottleConfig(BaseModel):
+    enabled: bool = True
+    # attempts per `window` seconds
+    username_limit: int = 10
+    ip_limit: int = 100
+    window: float = 60.0
+    # throttled keys kept in memory per worker
+    max_keys: int = 100_000
+
+
+class UserCacheConfig(BaseModel):
+    # per worker: writes invalidate only the local cache,
+    # other workers see a change after at most `ttl` seconds
+    maxsize: int = 10_000
+    ttl: float = 30.0
+
+
+class MaintenanceConfig(BaseModel):
+    # periodic jobs of `api_v1.auth.maintenance`, run by a single worker:
+    # the one holding the Postgres advisory lock `lock_key`
+    enabled: bool = True
+    lock_key: int = 7_245_901
+    # how often the other workers try to take over the lock
+    leader_poll_interval: float = 30.0
+    # users per transaction and pause between two, keeps locks short
+    chunk_size: int = 1_000
+    chunk_pause: float = 0.1
+    # accounts without a login for that long are deactivated, None: never
+    dormant_after_days: int | None = None
+    # deactivated accounts unchanged for that long are deleted, None: never
+    purge_inactive_after_days: int | None = None
+    housekeeping_interval: float = 86_400
+    stats_interval: float = 600
+    # a login updates `users.last_login_at` at most this often per user
+    last_login_resolution: float = 3_600
+
+
+class AdminConfig(BaseModel):
+    # sent as `X-Admin-Key`, the admin endpoints are disabled without it
+    api_key: SecretStr | None = None
+    max_page_size: int = 1_000
+    # rows fetched per round trip by the streaming export
+    export_batch_size: int = 1_000
+
+
+class UsernameIndexConfig(BaseModel):
+    # usernames the Bloom filter is sized for, per worker; it is rebuilt
+    # twice as large once there are more
+    capacity: int = 1_000_000
+    error_rate: float = 0.01
+    # seconds between loads of the users registered by other workers
+    refresh_interval: float = 10.0
+
+
+class TokenRevocationConfig(BaseModel):
+    # revoked refresh tokens the Bloom filter is sized for, per worker
+    bloom_capacity: int = 1_000_000
+    bloom_error_rate: float = 0.001
+    # seconds between loads of the tokens revoked by other workers
+    refresh_interval: float = 30.0
+    # seconds between purges of expired revoked tokens (a maintenance job),
+    # every worker rebuilds its filter as often to drop them
+    purge_interval: float = 3600.0
+
+
 class ApiV1Prefix(BaseModel):
     prefix: str = "/v1"
     auth: str = "/auth"
+    admin: str = "/admin"
 
 
 class ApiPrefix(BaseModel):
@@ -55,9 +191,15 @@ class ApiPrefix(BaseModel):
 class AuthJWT(BaseModel):
     private_key_path: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key_path: Path = BASE_DIR / "certs" / "jwt-public.pem"
-    algorithm: str = "RS256"
+    # the key pair must match, see `auth_crypto.keys` to generate one
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 30
+    # verified tokens kept per worker, each until its own `exp`
+    verified_token_cache_size: int = 10_000
+    # serve read-only endpoints from the access token claims, without the DB;
+    # a deactivation reaches them only once the access token has expired
+    stateless_access: bool = False
 
 
 class Settings(BaseSettings):
@@ -71,8 +213,18 @@ class Settings(BaseSettings):
 
     run: RunConfig = RunConfig()
     log: LoggingConfig = LoggingConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    warmup: WarmupConfig = WarmupConfig()
     api: ApiPrefix = ApiPrefix()
     auth_jwt: AuthJWT = AuthJWT()
+    hashing: HashingConfig = HashingConfig()
+    registration: RegistrationConfig = RegistrationConfig()
+    user_cache: UserCacheConfig = UserCacheConfig()
+    token_revocation: TokenRevocationConfig = TokenRevocationConfig()
+    username_index: UsernameIndexConfig = UsernameIndexConfig()
+    login_throttle: LoginThrottleConfig = LoginThrottleConfig()
+    maintenance: MaintenanceConfig = MaintenanceConfig()
+    admin: AdminConfig = AdminConfig()
     db: DatabaseConfig
 
 
@@ -1,12 +1,26 @@
+from typing import Literal
 from .logs import GunicornLogger
+from .profile import (
+    make_worker_class,
+    report_server_profile,
+    resolve_http,
+    resolve_loop,
+    resolve_workers,
+)
 
 
 def get_app_options(
     host: str,
     port: int,
-    workers: int,
+    workers: int | Literal["auto"],
     timeout: int,
     log_level: str,
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto",
+    http: Literal["auto", "h11", "httptools"] = "auto",
+    preload_app: bool = False,
+    keepalive: int = 5,
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
 ) -> dict:
     return {
         "accesslog": "-",
@@ -15,6 +29,14 @@ def get_app_options(
         "loglevel": log_level,
         "logger_class": GunicornLogger,
         "timeout": timeout,
-        "workers": workers,
-        "worker_class": "uvicorn.workers.UvicornWorker",
-    }
\ No newline at end of file
+        "workers": resolve_workers(workers),
+        "worker_class": make_worker_class(
+            loop=resolve_loop(loop),
+            http=resolve_http(http),
+        ),
+        "preload_app": preload_app,
+        "keepalive": keepalive,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
+        "when_ready": report_server_profile,
+    }
@@ -1,14 +1,25 @@
 from gunicorn.app.base import BaseApplication
 from fastapi import FastAPI
+from typing import Callable, Iterable
 
 
 class Application(BaseApplication):
-    def __init__(self, app: FastAPI, options: dict | None = None):
+    def __init__(
+        self,
+        app: FastAPI,
+        options: dict | None = None,
+        preload: Iterable[Callable[[], object]] = (),
+    ):
         self.options = options or {}
         self.app = app
+        # run where the app is loaded: once in the master with preload_app,
+        # otherwise in every worker
+        self.preload = tuple(preload)
         super().__init__()
 
     def load(self) -> FastAPI:
+        for func in self.preload:
+            func()
         return self.app
 
     @property
@@ -1,20 +1,28 @@
 from gunicorn.glogging import Logger
-from logging import Formatter
 from registration_app.core.config import settings
+from registration_app.core.logging_ import (
+    AccessLogSampler,
+    make_queue_handler,
+    remove_queue_handlers,
+    replace_handlers,
+)
 
 
 class GunicornLogger(Logger):
     def setup(self, cfg) -> None:
+        # gunicorn's own handlers are kept, but written to off the event loop;
+        # setup runs again on reload
+        remove_queue_handlers(self.error_log)
+        remove_queue_handlers(self.access_log)
         super().setup(cfg)
 
-        self._set_handler(
-            log=self.access_log,
-            output=cfg.accesslog,
-            fmt=Formatter(fmt=settings.log.log_format),
+        replace_handlers(
+            self.error_log,
+            make_queue_handler(self.error_log.handlers),
         )
 
-        self._set_handler(
-            log=self.error_log,
-            output=cfg.errorlog,
-            fmt=Formatter(fmt=settings.log.log_format),
+        access_handler = make_queue_handler(self.access_log.handlers)
+        access_handler.addFilter(
+            AccessLogSampler(settings.log.access_log_sample_rate)
         )
+        replace_handlers(self.access_log, access_handler)
@@ -0,0 +1,57 @@
+import os
+from importlib.util import find_spec
+from typing import Literal
+from uvicorn.workers import UvicornWorker
+
+
+def cpu_count() -> int:
+    # CPUs this process may run on, respects container / taskset limits
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_workers(workers: int | Literal["auto"]) -> int:
+    if workers == "auto":
+        return cpu_count()
+    return workers
+
+
+def resolve_loop(loop: Literal["auto", "asyncio", "uvloop"]) -> str:
+    if loop == "auto":
+        return "uvloop" if find_spec("uvloop") is not None else "asyncio"
+    return loop
+
+
+def resolve_http(http: Literal["auto", "h11", "httptools"]) -> str:
+    if http == "auto":
+        return "httptools" if find_spec("httptools") is not None else "h11"
+    return http
+
+
+def make_worker_class(loop: str, http: str) -> type[UvicornWorker]:
+    # gunicorn accepts a worker class object as well as its import path
+    return type(
+        "UvicornWorker",
+        (UvicornWorker,),
+        {"CONFIG_KWARGS": {"loop": loop, "http": http}},
+    )
+
+
+def report_server_profile(server) -> None:
+    """gunicorn `when_ready` hook: logs the effective server settings."""
+    cfg = server.cfg
+    worker_kwargs = cfg.worker_class.CONFIG_KWARGS
+    server.log.info(
+        "Server profile: workers=%s loop=%s http=%s preload_app=%s "
+        "keepalive=%ss timeout=%ss max_requests=%s max_requests_jitter=%s",
+        cfg.workers,
+        worker_kwargs["loop"],
+        worker_kwargs["http"],
+        cfg.preload_app,
+        cfg.keepalive,
+        cfg.timeout,
+        cfg.max_requests,
+        cfg.max_requests_jitter,
+    )
@@ -0,0 +1,36 @@
+import asyncio
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+from registration_app.core import db_helper
+
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+READINESS_DB_TIMEOUT = 2.0
+
+
+@router.get("")
+def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """
+    The DB answers and the pool can hand out a connection in time.
+    Replicas are only reported: reads fall back to the primary without them.
+    """
+    db_ok = True
+    try:
+        async with asyncio.timeout(READINESS_DB_TIMEOUT):
+            async with db_helper.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except Exception:
+        db_ok = False
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "status": "ok" if db_ok else "unavailable",
+        "db": db_ok,
+        "pool": db_helper.pool_status(),
+    }
@@ -0,0 +1,22 @@
+__all__ = (
+    "AccessLogSampler",
+    "BackgroundQueueHandler",
+    "CorrelationIdMiddleware",
+    "JsonFormatter",
+    "correlation_id",
+    "make_queue_handler",
+    "remove_queue_handlers",
+    "replace_handlers",
+    "setup_logging",
+)
+
+from .context import CorrelationIdMiddleware, correlation_id
+from .formatters import JsonFormatter
+from .handlers import (
+    AccessLogSampler,
+    BackgroundQueueHandler,
+    make_queue_handler,
+    remove_queue_handlers,
+    replace_handlers,
+    setup_logging,
+)
@@ -0,0 +1,48 @@
+import re
+from contextvars import ContextVar
+from uuid import uuid4
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# ids from clients / proxies are reused only if they look like ids
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+# id of the request being handled, added to every log record
+correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+class CorrelationIdMiddleware:
+    """
+    Gives every HTTP request an id: the incoming `X-Request-ID`
+    or a new one. It is returned in the same header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+
+        if request_id is None or not _VALID_REQUEST_ID.fullmatch(request_id):
+            request_id = uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = correlation_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            correlation_id.reset(token)
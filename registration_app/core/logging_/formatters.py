@@ -0,0 +1,44 @@
+import json
+import logging
+from datetime import datetime, UTC
+from registration_app.core.config import settings
+
+
+# attributes of every LogRecord, anything else was passed with `extra=`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "correlation_id", "color_message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, `extra=` fields included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, default=str)
+
+
+def make_formatter() -> logging.Formatter:
+    if settings.log.structured:
+        return JsonFormatter()
+    return logging.Formatter(fmt=settings.log.log_format)
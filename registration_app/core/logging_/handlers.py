@@ -0,0 +1,123 @@
+import atexit
+import copy
+import logging
+import os
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from registration_app.core.config import settings
+from .context import correlation_id
+from .formatters import make_formatter
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to a listener thread that formats and writes them
+    with `handlers`, so logging never blocks the event loop on I/O.
+    The thread is started lazily and per process: threads don't
+    survive a gunicorn fork.
+    """
+
+    def __init__(self, handlers: list[logging.Handler]) -> None:
+        super().__init__(SimpleQueue())
+        self.targets = handlers
+        self._listener: QueueListener | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # the queue of the parent process may hold records it never wrote
+            self.queue = SimpleQueue()
+            self._listener = QueueListener(
+                self.queue,
+                *self.targets,
+                respect_handler_level=True,
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatting is left to the listener, only what may change
+        # before it runs is resolved here, in the emitting thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.correlation_id = correlation_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        super().enqueue(record)
+
+    def close(self) -> None:
+        # writes the records still queued
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+        super().close()
+
+
+class AccessLogSampler(logging.Filter):
+    """
+    Keeps `rate` of the successful access log records, and all of
+    the failed ones (status >= 400).
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0:
+            return True
+
+        # uvicorn: (client, method, path, http version, status code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 5 and isinstance(args[4], int):
+            if args[4] >= 400:
+                return True
+
+        return random.random() < self.rate
+
+
+def make_queue_handler(handlers: list[logging.Handler]) -> BackgroundQueueHandler:
+    formatter = make_formatter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = BackgroundQueueHandler(handlers)
+    atexit.register(queue_handler.close)
+    return queue_handler
+
+
+def remove_queue_handlers(logger: logging.Logger) -> None:
+    for handler in logger.handlers:
+        if isinstance(handler, BackgroundQueueHandler):
+            handler.close()
+    logger.handlers = [
+        handler
+        for handler in logger.handlers
+        if not isinstance(handler, BackgroundQueueHandler)
+    ]
+
+
+def replace_handlers(logger: logging.Logger, handler: logging.Handler) -> None:
+    remove_queue_handlers(logger)
+    logger.handlers = [handler]
+
+
+def setup_logging() -> None:
+    """Application loggers: everything propagates to the root logger."""
+    root = logging.getLogger()
+    root.setLevel(settings.log.log_level.upper())
+    replace_handlers(root, make_queue_handler([logging.StreamHandler(sys.stderr)]))
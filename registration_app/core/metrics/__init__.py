@@ -0,0 +1,50 @@
+__all__ = (
+    "registry",
+    "http_request_duration",
+    "password_hashing_duration",
+    "jwt_duration",
+    "db_query_duration",
+    "db_pool_checkout_wait",
+    "db_pool_connection_hold",
+    "db_pool_connections",
+    "db_replica_reads",
+    "db_replica_failures",
+    "token_revocation_checks",
+    "username_index_checks",
+    "scheduled_job_duration",
+    "scheduled_job_rows",
+    "users_count",
+    "cache_entries",
+    "single_flight_calls",
+    "track_cache",
+    "track_single_flight",
+    "MetricsMiddleware",
+    "router",
+    "flush_metrics_periodically",
+    "reset_multiproc_dir",
+)
+
+from .instruments import (
+    registry,
+    http_request_duration,
+    password_hashing_duration,
+    jwt_duration,
+    db_query_duration,
+    db_pool_checkout_wait,
+    db_pool_connection_hold,
+    db_pool_connections,
+    db_replica_reads,
+    db_replica_failures,
+    token_revocation_checks,
+    username_index_checks,
+    scheduled_job_duration,
+    scheduled_job_rows,
+    users_count,
+    cache_entries,
+    single_flight_calls,
+    track_cache,
+    track_single_flight,
+)
+from .middleware import MetricsMiddleware
+from .views import router
+from .flush import flush_metrics_periodically, reset_multiproc_dir
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+from registration_app.core.config import settings
+from .instruments import registry
+
+
+log = logging.getLogger(__name__)
+
+
+async def flush_metrics_periodically() -> None:
+    """Dump this worker's metrics for the others to aggregate, until cancelled."""
+    while True:
+        await asyncio.sleep(settings.metrics.flush_interval)
+        try:
+            registry.write_dump()
+        except OSError:
+            log.exception("Could not write metrics to %s", registry.multiproc_dir)
+
+
+def reset_multiproc_dir() -> None:
+    """Run once in the gunicorn master before the workers start."""
+    if registry.multiproc_dir is None:
+        return
+
+    registry.multiproc_dir.mkdir(parents=True, exist_ok=True)
+    for path in registry.multiproc_dir.glob("metrics_*.json"):
+        path.unlink(missing_ok=True)
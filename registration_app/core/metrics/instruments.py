@@ -0,0 +1,145 @@
+from typing import Callable
+from registration_app.core.config import settings
+from registration_app.core.utils.single_flight import SingleFlight
+from registration_app.core.utils.ttl_cache import TTLCache
+from .registry import Counter, MetricsRegistry
+
+
+registry = MetricsRegistry(multiproc_dir=settings.metrics.multiproc_dir)
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "path", "status"),
+)
+
+password_hashing_duration = registry.histogram(
+    "password_hashing_duration_seconds",
+    "bcrypt time spent in the hashing pool, without queueing.",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 2.0),
+)
+
+jwt_duration = registry.histogram(
+    "jwt_duration_seconds",
+    "JWT signing and verification time.",
+    ("operation",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "DB time of every crud function.",
+    ("function",),
+)
+
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+)
+
+db_pool_connection_hold = registry.histogram(
+    "db_pool_connection_hold_seconds",
+    "Time a connection stays checked out of the pool.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+db_pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Connections of the DB pool: checked out, idle, overflow and waiters.",
+    ("state",),
+)
+
+db_replica_reads = registry.counter(
+    "db_replica_reads_total",
+    "Sessions for replica reads: served by a replica or by the primary.",
+    ("target",),
+)
+
+db_replica_failures = registry.counter(
+    "db_replica_failures_total",
+    "Replicas left out of the rotation after a connection error.",
+    ("replica",),
+)
+
+token_revocation_checks = registry.counter(
+    "token_revocation_checks_total",
+    "Refresh token revocation checks: answered by the Bloom filter or the DB.",
+    ("result",),
+)
+
+username_index_checks = registry.counter(
+    "username_index_checks_total",
+    "Username checks: answered by the Bloom filter or the DB.",
+    ("result",),
+)
+
+scheduled_job_duration = registry.histogram(
+    "scheduled_job_duration_seconds",
+    "Run time of the scheduled maintenance jobs.",
+    ("job", "result"),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+scheduled_job_rows = registry.counter(
+    "scheduled_job_rows_total",
+    "Rows changed by the scheduled maintenance jobs.",
+    ("job",),
+)
+
+users_count = registry.gauge(
+    "users",
+    "Users by state, counted by the worker running the maintenance jobs.",
+    ("state",),
+)
+
+cache_entries = registry.gauge(
+    "cache_entries",
+    "Entries in the in-process caches.",
+    ("cache",),
+)
+
+cache_lookups = registry.counter(
+    "cache_lookups_total",
+    "Lookups in the in-process caches since the worker started.",
+    ("cache", "result"),
+)
+
+single_flight_calls = registry.counter(
+    "single_flight_calls_total",
+    "Calls of the single-flight groups since the worker started: executed or coalesced.",
+    ("flight", "result"),
+)
+
+
+def _count_since_last_collect(
+    counter: Counter,
+    totals: Callable[[], dict[str, int]],
+    **labels: str,
+) -> None:
+    """Keep `counter` in step with totals counted by an object itself."""
+    reported = {}
+
+    def collect() -> None:
+        for result, total in totals().items():
+            counter.inc(total - reported.get(result, 0), result=result, **labels)
+            reported[result] = total
+
+    registry.on_collect(collect)
+
+
+def track_cache(name: str, cache: TTLCache) -> None:
+    registry.on_collect(lambda: cache_entries.set(len(cache), cache=name))
+    _count_since_last_collect(
+        cache_lookups,
+        lambda: {"hit": cache.hits, "miss": cache.misses},
+        cache=name,
+    )
+
+
+def track_single_flight(name: str, flight: SingleFlight) -> None:
+    _count_since_last_collect(
+        single_flight_calls,
+        lambda: {"executed": flight.executed, "coalesced": flight.coalesced},
+        flight=name,
+    )
@@ -0,0 +1,36 @@
+from time import perf_counter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .instruments import http_request_duration
+
+
+class MetricsMiddleware:
+    """Observes every HTTP request, labelled by its route path template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # the template, not the raw path, keeps the label set bounded
+            route = scope.get("route")
+            http_request_duration.observe(
+                perf_counter() - start,
+                method=scope["method"],
+                path=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
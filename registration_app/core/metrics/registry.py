@@ -0,0 +1,281 @@
+"""
+A minimal Prometheus-compatible metrics registry.
+
+Every gunicorn worker keeps its own values and, in multi-process mode,
+regularly dumps them to `<multiproc_dir>/metrics_<pid>.json`. Scraping any
+worker merges the dumps of all workers: counters and histograms are summed
+(including those of workers that have exited), gauges only over live workers.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterator
+
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric(ABC):
+    type: str = ""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def dump(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self._dump_samples(),
+        }
+
+    @abstractmethod
+    def _dump_samples(self) -> list:
+        ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _dump_samples(self) -> list:
+        return [[list(key), value] for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._label_values(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def clear(self) -> None:
+        """Drop every sample, e.g. when this worker stops reporting them."""
+        self._values.clear()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+            self,
+            *args,
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+            **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [counts per bucket (+Inf last), sum]
+        self._values: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def dump(self) -> dict:
+        return super().dump() | {"buckets": list(self.buckets)}
+
+    def _dump_samples(self) -> list:
+        return [
+            [list(key), {"counts": counts, "sum": total}]
+            for key, (counts, total) in self._values.items()
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self, multiproc_dir: Path | None = None) -> None:
+        self.multiproc_dir = multiproc_dir
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets=buckets)
+        )
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Run `callback` before every dump, e.g. to refresh gauges."""
+        self._collectors.append(callback)
+
+    def dump(self) -> dict:
+        for callback in self._collectors:
+            callback()
+
+        return {name: metric.dump() for name, metric in self._metrics.items()}
+
+    # multi-process mode
+
+    def _dump_path(self, pid: int) -> Path:
+        return self.multiproc_dir / f"metrics_{pid}.json"
+
+    def write_dump(self) -> None:
+        if self.multiproc_dir is None:
+            return
+
+        path = self._dump_path(os.getpid())
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.dump()))
+        os.replace(tmp_path, path)
+
+    def _read_dumps(self) -> Iterator[tuple[bool, dict]]:
+        """(is the worker alive, its dump) for every dump on disk."""
+        for path in self.multiproc_dir.glob("metrics_*.json"):
+            pid = int(path.stem.removeprefix("metrics_"))
+            try:
+                yield _pid_alive(pid), json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+
+    def collect(self) -> dict:
+        if self.multiproc_dir is None:
+            return self.dump()
+
+        self.write_dump()
+        merged: dict = {}
+        for alive, dump in self._read_dumps():
+            for name, metric in dump.items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**metric, "samples": []})
+                _merge_metric(target, metric)
+
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in self.collect().items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            labelnames = metric["labelnames"]
+            for label_values, value in metric["samples"]:
+                labels = dict(zip(labelnames, label_values))
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+
+                cumulative = 0
+                bounds = [*metric["buckets"], "+Inf"]
+                for bound, count in zip(bounds, value["counts"]):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels | {"le": str(bound)})
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _merge_metric(target: dict, metric: dict) -> None:
+    samples = {tuple(labels): value for labels, value in target["samples"]}
+    for labels, value in metric["samples"]:
+        key = tuple(labels)
+        current = samples.get(key)
+        if current is None:
+            samples[key] = value
+        elif metric["type"] == "histogram":
+            samples[key] = {
+                "counts": [
+                    a + b for a, b in zip(current["counts"], value["counts"])
+                ],
+                "sum": current["sum"] + value["sum"],
+            }
+        else:
+            samples[key] = current + value
+
+    target["samples"] = [[list(key), value] for key, value in samples.items()]
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in labels.items()
+    ) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from .instruments import registry
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # on the event loop, never in the threadpool: the metrics are updated
+    # from the loop without locks, and only it writes this worker's dump
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
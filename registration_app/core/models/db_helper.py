@@ -1,11 +1,127 @@
+import logging
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from itertools import cycle
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
     async_sessionmaker,
     AsyncSession
 )
-from typing import AsyncGenerator
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from time import monotonic, perf_counter
+from typing import AsyncGenerator, AsyncIterator, Callable, Sequence
 from registration_app.core.config import settings
+from registration_app.core.metrics import (
+    db_pool_checkout_wait,
+    db_pool_connection_hold,
+    db_pool_connections,
+    db_replica_failures,
+    db_replica_reads,
+    registry as metrics_registry,
+)
+
+
+log = logging.getLogger(__name__)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool reporting how long every checkout waited for a connection,
+    how many checkouts are waiting right now and how long the connections
+    stay checked out.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.checkouts = 0
+        self.held_seconds = 0.0
+
+    def _do_get(self):
+        self.waiting += 1
+        start = perf_counter()
+        try:
+            record = super()._do_get()
+        finally:
+            self.waiting -= 1
+            db_pool_checkout_wait.observe(perf_counter() - start)
+
+        self.checkouts += 1
+        record.info["checked_out_at"] = perf_counter()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            held = perf_counter() - checked_out_at
+            self.held_seconds += held
+            db_pool_connection_hold.observe(held)
+
+        super()._do_return_conn(record)
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    End the read-only transaction of the session, giving its connection
+    back to the pool now rather than when the request is done: the session
+    checks out a connection again on its next query, if any. Only for
+    sessions without pending changes, they would be rolled back.
+    """
+    if session.in_transaction():
+        await session.rollback()
+
+
+def _pool_status(engine: AsyncEngine, max_overflow: int) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": max_overflow,
+        "waiting": pool.waiting,
+        "checkouts": pool.checkouts,
+        "held_seconds": round(pool.held_seconds, 3),
+    }
+
+
+class Replica:
+    """A read replica, out of the rotation for a while after failing."""
+
+    def __init__(self, name: str, engine: AsyncEngine, retry_interval: float) -> None:
+        self.name = name
+        self.engine = engine
+        self.retry_interval = retry_interval
+        self.down_until = 0.0
+        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+            bind=engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False
+        )
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    @property
+    def available(self) -> bool:
+        return monotonic() >= self.down_until
+
+    def mark_down(self, reason: object) -> None:
+        if self.available:
+            log.warning(
+                "Replica %s is down for %ss: %s",
+                self.name,
+                self.retry_interval,
+                reason,
+            )
+            db_replica_failures.inc(replica=self.name)
+        self.down_until = monotonic() + self.retry_interval
+
+    def _on_error(self, context) -> None:
+        # lost connections in the middle of a query
+        if context.is_disconnect:
+            self.mark_down(context.original_exception)
 
 
 class DatabaseHelper:
@@ -15,15 +131,32 @@ class DatabaseHelper:
             echo: bool = False,
             echo_pool: bool = False,
             pool_size: int = 10,
-            max_overflow: int = 10
+            max_overflow: int = 10,
+            pool_timeout: float = 30.0,
+            pool_recycle: int = -1,
+            pool_pre_ping: bool = False,
+            prepared_statement_cache_size: int = 100,
+            statement_cache_size: int = 100,
+            replica_urls: Sequence[str] = (),
+            replica_retry_interval: float = 30.0,
     ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
+        self.max_overflow = max_overflow
+        self._engine_options = dict(
             echo=echo,
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            poolclass=TimedQueuePool,
         )
+        self._asyncpg_connect_args = {
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "statement_cache_size": statement_cache_size,
+        }
+
+        self.engine: AsyncEngine = self._create_engine(url)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -31,19 +164,131 @@ class DatabaseHelper:
             expire_on_commit=False
         )
 
+        self.replicas = [
+            Replica(
+                name=self._replica_name(replica_url),
+                engine=self._create_engine(replica_url),
+                retry_interval=replica_retry_interval,
+            )
+            for replica_url in replica_urls
+        ]
+        self._replica_rotation = cycle(self.replicas)
+
+    def _create_engine(self, url: str) -> AsyncEngine:
+        connect_args = {}
+        if make_url(url).get_driver_name() == "asyncpg":
+            connect_args = self._asyncpg_connect_args
+
+        return create_async_engine(
+            url=url,
+            connect_args=connect_args,
+            **self._engine_options,
+        )
+
+    @staticmethod
+    def _replica_name(url: str) -> str:
+        # for logs and metrics, without the credentials
+        url = make_url(url)
+        return f"{url.host}:{url.port or 5432}" if url.host else str(url.database)
+
     # close engine (connection)
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def pool_status(self) -> dict:
+        status = _pool_status(self.engine, self.max_overflow)
+        if self.replicas:
+            status["replicas"] = {
+                replica.name: {
+                    "available": replica.available,
+                    **_pool_status(replica.engine, self.max_overflow),
+                }
+                for replica in self.replicas
+            }
+        return status
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+        # lazy: the session checks out a connection on its first query only
         async with self.session_factory() as session:
             yield session
 
+    async def session_factory_getter(self) -> async_sessionmaker[AsyncSession]:
+        """`session_factory` itself, for work done after the response."""
+        return self.session_factory
+
+    async def _connect_replica(self) -> AsyncSession | None:
+        """A session connected to the next available replica, if any."""
+        for _ in self.replicas:
+            replica = next(self._replica_rotation)
+            if not replica.available:
+                continue
+
+            session = replica.session_factory()
+            try:
+                # connect now, so that a failing replica is skipped already
+                await session.connection()
+            except Exception as exc:
+                await session.close()
+                replica.mark_down(exc)
+                continue
+
+            session.info["replica"] = replica.name
+            return session
+
+        return None
+
+    @asynccontextmanager
+    async def replica_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Session for read-only lookups that tolerate replication lag: on a
+        replica, round-robin, or on the primary when none is available.
+        Writes and reads of what was just written use `session_factory`.
+        """
+        # `info["replica"]`: the name of the replica, missing on the primary
+        session = await self._connect_replica()
+        if session is not None:
+            db_replica_reads.inc(target="replica")
+        else:
+            session = self.session_factory()
+            if self.replicas:
+                db_replica_reads.inc(target="primary")
+
+        async with session:
+            yield session
+
+    async def replica_session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+        async with self.replica_session() as session:
+            yield session
+
+    async def replica_sessions_getter(
+        self,
+    ) -> Callable[[], AbstractAsyncContextManager[AsyncSession]]:
+        """`replica_session` itself, for endpoints that may not need one."""
+        return self.replica_session
+
 
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
     echo=settings.db.echo,
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
-    max_overflow=settings.db.max_overflow
+    max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    pool_recycle=settings.db.pool_recycle,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+    statement_cache_size=settings.db.statement_cache_size,
+    replica_urls=[str(url) for url in settings.db.replica_urls],
+    replica_retry_interval=settings.db.replica_retry_interval,
 )
+
+
+def _collect_pool_metrics() -> None:
+    status = db_helper.pool_status()
+    for state in ("checked_out", "idle", "overflow", "waiting"):
+        db_pool_connections.set(status[state], state=state)
+
+
+metrics_registry.on_collect(_collect_pool_metrics)
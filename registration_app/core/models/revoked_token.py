@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class RevokedToken(Base):
+    """Отозванный refresh токен, хранится до истечения его срока"""
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    # expired tokens are rejected anyway, the row is purged after that
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=text("TIMEZONE('utc', now())"),
+        index=True,
+    )
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(jti = {self.jti!r}, user_id = {self.user_id})"
+
+    def __repr__(self):
+        return str(self)
@@ -18,6 +18,10 @@ class User(Base, IdIntPkMixin):
     email: Mapped[str]
     money: Mapped[Decimal] = mapped_column(Numeric, default=0)
     is_active: Mapped[bool] = mapped_column(default=True)
+    # bumped on every credential change, stale access tokens are detected by it
+    credential_version: Mapped[int] = mapped_column(default=0, server_default="0")
+    # set by `/login`, at most every `maintenance.last_login_resolution` seconds
+    last_login_at: Mapped[datetime | None]
     created_at: Mapped[datetime] = mapped_column(
         server_default=text("TIMEZONE('utc', now())")
     )
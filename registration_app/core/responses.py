@@ -0,0 +1,31 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# orjson is optional: without it the stdlib json is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    """Compact JSON of JSON types, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+DefaultJSONResponse: type[JSONResponse] = (
+    ORJSONResponse if orjson is not None else JSONResponse
+)
+
+
+def fast_json_response(content: dict, status_code: int = 200) -> JSONResponse:
+    """
+    Response for content the endpoint builds itself from trusted values:
+    returning it skips the validation against the `response_model` of the
+    route and `jsonable_encoder`, the model is still used for the OpenAPI docs.
+    Values must be JSON types already.
+    """
+    return DefaultJSONResponse(content, status_code=status_code)
@@ -0,0 +1,122 @@
+"""
+In-process scheduler of periodic jobs, for a single worker at a time.
+
+Every worker runs `Scheduler.run`, the one that gets the Postgres
+advisory lock `lock_key` leads: it runs the jobs, the others retry every
+`poll_interval` seconds. The lock is held by a dedicated connection and
+goes away with it, so a worker that exits or loses its connection hands
+over to another one. Without Postgres (e.g. SQLite) every worker leads.
+"""
+
+import asyncio
+import logging
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from registration_app.core.metrics import scheduled_job_duration
+from registration_app.core.models.db_helper import DatabaseHelper
+
+
+log = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[None]],
+    ) -> None:
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.next_run = 0.0
+
+    async def run(self) -> None:
+        start = perf_counter()
+        result = "ok"
+        try:
+            await self.func()
+        except Exception:
+            result = "error"
+            log.exception("Job %r failed", self.name)
+        finally:
+            scheduled_job_duration.observe(
+                perf_counter() - start,
+                job=self.name,
+                result=result,
+            )
+            self.next_run = monotonic() + self.interval
+
+
+class Scheduler:
+    def __init__(
+        self,
+        db: DatabaseHelper,
+        lock_key: int,
+        poll_interval: float,
+    ) -> None:
+        self.db = db
+        self.lock_key = lock_key
+        self.poll_interval = poll_interval
+        self.jobs: list[Job] = []
+        self.is_leader = False
+
+    def add_job(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[None]],
+    ) -> None:
+        self.jobs.append(Job(name, interval, func))
+
+    async def _try_lock(self, conn: AsyncConnection) -> bool:
+        if conn.dialect.name != "postgresql":
+            return True
+
+        # session level: held until unlocked or the connection is closed
+        return await conn.scalar(select(func.pg_try_advisory_lock(self.lock_key)))
+
+    async def _lead(self, conn: AsyncConnection) -> None:
+        self.is_leader = True
+        log.info("Running the scheduled jobs: %s", [job.name for job in self.jobs])
+
+        # jobs run one after the other, all of them once on taking over
+        for job in self.jobs:
+            job.next_run = 0.0
+
+        while True:
+            for job in self.jobs:
+                if job.next_run <= monotonic():
+                    await job.run()
+
+            # the lock is gone with the connection: stop leading then
+            await conn.scalar(select(1))
+
+            next_run = min((job.next_run for job in self.jobs), default=monotonic())
+            await asyncio.sleep(
+                min(max(next_run - monotonic(), 0.0), self.poll_interval)
+            )
+
+    async def run(self) -> None:
+        """Lead whenever possible, until cancelled."""
+        while True:
+            try:
+                async with self.db.engine.connect() as conn:
+                    # no transaction left open by the lock or the checks
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    if await self._try_lock(conn):
+                        try:
+                            await self._lead(conn)
+                        finally:
+                            # closing it releases the lock, whatever happened
+                            await conn.invalidate()
+            except Exception:
+                log.exception("Scheduler lost its DB connection")
+            finally:
+                if self.is_leader:
+                    log.info("Not running the scheduled jobs anymore")
+                self.is_leader = False
+
+            await asyncio.sleep(self.poll_interval)
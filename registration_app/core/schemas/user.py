@@ -1,5 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from decimal import Decimal
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Row
+from typing import Literal
 
 
 class CreateUser(BaseModel):
@@ -16,17 +19,90 @@ class SuccessOperationUser(BaseModel):
     email: EmailStr | None = None
 
 
+class RegisteredUser(SuccessOperationUser):
+    # with `registration.issue_tokens` only
+    access_token: str | None = None
+    refresh_token: str | None = None
+    token_type: str | None = None
+
+
+class BatchUserResult(BaseModel):
+    row: int
+    username: str | None = None
+    status: Literal["created", "conflict", "invalid"]
+    detail: str | None = None
+
+
+class BatchRegistrationResult(BaseModel):
+    created: int = 0
+    conflicted: int = 0
+    invalid: int = 0
+    results: list[BatchUserResult] = []
+    # every chunk commits on its own: rows before this one are done
+    # even when the batch fails afterwards
+    committed_rows: int = 0
+    # why the rows from `committed_rows` on were not registered
+    error: str | None = None
+
+
 class UserChangePassword(BaseModel):
     current_password: str
     new_password: str = Field(..., min_length=8)
 
 
-class UserSchema(BaseModel):
-    model_config = ConfigDict(strict=True, from_attributes=True)
+# Users read from our own table, or from the claims of a token we signed,
+# are trusted: they are plain slotted objects built without validation.
+# Request data is validated by the models above.
 
+@dataclass(slots=True, kw_only=True)
+class UserProfile:
     id: int
     username: str
-    hashed_password: str
-    email: EmailStr
-    money: Decimal = Field(..., ge=0)
+    email: str
     is_active: bool = True
+    credential_version: int = 0
+
+    @classmethod
+    def from_row(cls, row: Row) -> "UserProfile":
+        """From a row of `statements.PROFILE_COLUMNS`."""
+        return cls(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            is_active=row.is_active,
+            credential_version=row.credential_version,
+        )
+
+
+@dataclass(slots=True, kw_only=True)
+class UserSchema(UserProfile):
+    hashed_password: str
+    last_login_at: datetime | None = None
+
+    @classmethod
+    def from_row(cls, row: Row) -> "UserSchema":
+        """From a row of `statements.LOGIN_COLUMNS`."""
+        return cls(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            is_active=row.is_active,
+            credential_version=row.credential_version,
+            hashed_password=row.hashed_password,
+            last_login_at=row.last_login_at,
+        )
+
+
+class AdminUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class AdminUsersPage(BaseModel):
+    users: list[AdminUser]
+    # pass it as `after_id` for the next page, None on the last one
+    next_after_id: int | None = None
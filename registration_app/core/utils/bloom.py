@@ -0,0 +1,47 @@
+from hashlib import blake2b
+from math import ceil, log
+from typing import Iterator
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives:
+    `key in bloom` is False only if the key was never added.
+    Keys can't be removed, the filter is rebuilt instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # optimal size and number of hashes for `capacity` keys
+        self.size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __len__(self) -> int:
+        # keys added, repeated keys included
+        return self.count
+
+    def _positions(self, key: str) -> Iterator[int]:
+        # double hashing: k positions out of a single 128-bit digest
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
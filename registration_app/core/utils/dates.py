@@ -0,0 +1,6 @@
+from datetime import datetime, UTC
+
+
+def utc_now() -> datetime:
+    # the tables store naive UTC datetimes
+    return datetime.now(UTC).replace(tzinfo=None)
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Abandoned(Exception):
+    """The shared call was cancelled together with the caller running it."""
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Concurrent calls for the same key share one execution: the first
+    caller runs it, the ones arriving meanwhile wait for its result or
+    its exception. Nothing is kept once the call is done.
+    """
+
+    def __init__(self) -> None:
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        # calls in flight
+        return len(self._calls)
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is None:
+            return await self._execute(key, func)
+
+        self.coalesced += 1
+        try:
+            # a waiter going away must not cancel the call of the others
+            return await asyncio.shield(call)
+        except _Abandoned:
+            return await self.do(key, func)
+
+    async def _execute(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        self.executed += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # the waiters run it again themselves
+            self._fail(call, _Abandoned())
+            raise
+        except Exception as exc:
+            self._fail(call, exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def forget(self, key: K) -> None:
+        """Callers from now on run a new call, e.g. after the data changed."""
+        self._calls.pop(key, None)
+
+    @staticmethod
+    def _fail(call: asyncio.Future, exc: BaseException) -> None:
+        call.set_exception(exc)
+        # retrieved: no "exception was never retrieved" without waiters
+        call.exception()
@@ -1,26 +1,84 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 from api_v1 import router as router_v1
+from registration_app.core import db_helper
 from registration_app.core.config import settings
+from registration_app.core.health import router as health_router
+from registration_app.core.responses import DefaultJSONResponse
+from registration_app.core.logging_ import CorrelationIdMiddleware, setup_logging
+from registration_app.api_v1.auth.warmup import warm_up
+from registration_app.api_v1.auth.revocation import (
+    load_revocation_store,
+    maintain_revocation_store,
+)
+from registration_app.api_v1.auth.username_index import (
+    load_username_index,
+    maintain_username_index,
+)
+from registration_app.api_v1.auth.maintenance import scheduler
+from registration_app.api_v1.auth_crypto.hashing import password_hasher
+from registration_app.core.metrics import (
+    MetricsMiddleware,
+    flush_metrics_periodically,
+    registry as metrics_registry,
+    router as metrics_router,
+)
+
+
+setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load the ML model
+    if settings.warmup.enabled:
+        await warm_up(
+            app,
+            connections=settings.warmup.db_connections,
+            timeout=settings.warmup.timeout,
+        )
+
+    await load_revocation_store()
+    await load_username_index()
+    tasks = [
+        asyncio.create_task(maintain_revocation_store()),
+        asyncio.create_task(maintain_username_index()),
+    ]
+    if settings.maintenance.enabled:
+        tasks.append(asyncio.create_task(scheduler.run()))
+    if metrics_registry.multiproc_dir is not None:
+        tasks.append(asyncio.create_task(flush_metrics_periodically()))
+
     yield
-    # Clean up the ML models and release the resources
+
+    for task in tasks:
+        task.cancel()
+    # their cleanup (the scheduler gives up its lock...) runs before the
+    # engine is disposed
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if metrics_registry.multiproc_dir is not None:
+        metrics_registry.write_dump()
+
+    password_hasher.shutdown()
+    await db_helper.dispose()
 
 
 app = FastAPI(
     lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
     title="Users API",
     version="1.0.0",
     description="Working with users.",
 )
 
 app.include_router(router_v1, prefix=settings.api.prefix)
+app.include_router(health_router)
+
+if settings.metrics.enabled:
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
 
 
 app.add_middleware(
@@ -29,7 +87,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# outermost: the id is set before anything else logs
+app.add_middleware(CorrelationIdMiddleware)
 
 
 if __name__ == "__main__":
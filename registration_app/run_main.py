@@ -1,9 +1,12 @@
 from registration_app.core.config import settings
 from registration_app.core.gunicorn_ import Application, get_app_options
+from registration_app.core.metrics import reset_multiproc_dir
+from registration_app.api_v1.auth_crypto import utils as auth_utils
 from main import app
 
 
 def main():
+    reset_multiproc_dir()
     Application(
         app=app,
         options=get_app_options(
@@ -12,7 +15,18 @@ def main():
             timeout=settings.run.timeout,
             workers=settings.run.workers,
             log_level=settings.log.log_level,
-        )
+            loop=settings.run.loop,
+            http=settings.run.http,
+            preload_app=settings.run.preload_app,
+            keepalive=settings.run.keepalive,
+            max_requests=settings.run.max_requests,
+            max_requests_jitter=settings.run.max_requests_jitter,
+        ),
+        preload=(
+            auth_utils.get_private_key,
+            auth_utils.get_public_key,
+            app.openapi,
+        ),
     ).run()
 
 
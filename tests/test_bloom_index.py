@@ -0,0 +1,127 @@
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from benchmarks.common import create_sqlite_db_helper
+from registration_app.api_v1.auth import revocation
+from registration_app.api_v1.auth.revocation import TokenRevocationStore
+from registration_app.api_v1.auth.username_index import UsernameIndex
+from registration_app.core.models.revoked_token import RevokedToken
+from registration_app.core.models.user import User
+from registration_app.core.utils.bloom import BloomFilter
+
+
+def run_with_db(scenario) -> None:
+    """Run `scenario(session)` against a throwaway SQLite database."""
+
+    async def main() -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            helper = await create_sqlite_db_helper(Path(tmp_dir) / "test.sqlite3")
+            try:
+                async with helper.session_factory() as session:
+                    session.add(
+                        User(username="alice", hashed_password="x", email="a@example.com")
+                    )
+                    await session.commit()
+                    await scenario(session)
+            finally:
+                await helper.dispose()
+
+    asyncio.run(main())
+
+
+async def revoke(session, jti: str, created_at: datetime | None = None) -> None:
+    expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=1)
+    token = RevokedToken(jti=jti, user_id=1, expires_at=expires_at)
+    if created_at is not None:
+        token.created_at = created_at
+    session.add(token)
+    await session.commit()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    keys = [f"jti-{i}" for i in range(1_000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+
+def test_checks_go_to_the_db_until_the_first_load(monkeypatch):
+    store = TokenRevocationStore(name="test_revoked", capacity=100, error_rate=0.01)
+    looked_up = []
+
+    async def is_token_revoked(session, jti):
+        looked_up.append(jti)
+        return False
+
+    monkeypatch.setattr(revocation, "is_token_revoked", is_token_revoked)
+
+    async def scenario(session) -> None:
+        assert not await store.is_revoked(session, "never-revoked")
+        assert looked_up == ["never-revoked"]
+
+        await store.load(session)
+        # the filter answers for tokens it never saw
+        assert not await store.is_revoked(session, "never-revoked")
+        assert looked_up == ["never-revoked"]
+
+    run_with_db(scenario)
+
+
+def test_revoked_tokens_are_rejected_after_load_and_refresh():
+    store = TokenRevocationStore(name="test_revoked", capacity=100, error_rate=0.01)
+
+    async def scenario(session) -> None:
+        await revoke(session, "revoked-before-load")
+        await store.load(session)
+        assert await store.is_revoked(session, "revoked-before-load")
+
+        # by another worker: only a refresh brings it in
+        await revoke(session, "revoked-after-load")
+        assert "revoked-after-load" not in store.bloom
+        await store.refresh(session)
+        assert await store.is_revoked(session, "revoked-after-load")
+        assert await store.is_revoked(session, "revoked-before-load")
+
+    run_with_db(scenario)
+
+
+def test_refresh_loads_rows_committed_late_within_the_overlap():
+    store = TokenRevocationStore(name="test_revoked", capacity=100, error_rate=0.01)
+
+    async def scenario(session) -> None:
+        await revoke(session, "first")
+        await store.load(session)
+
+        # its transaction started (and set `created_at`) before the last
+        # row loaded, it committed after the load
+        await revoke(session, "late", created_at=store.position - timedelta(seconds=30))
+        await store.refresh(session)
+        assert "late" in store.bloom
+
+    run_with_db(scenario)
+
+
+def test_filter_is_rebuilt_twice_as_large_once_full():
+    index = UsernameIndex(name="test_usernames", capacity=2, error_rate=0.01)
+
+    async def scenario(session) -> None:
+        await index.load(session)
+        session.add_all(
+            User(username=f"user{i}", hashed_password="x", email=f"u{i}@example.com")
+            for i in range(3)
+        )
+        await session.commit()
+
+        await index.refresh(session)  # 4 names in a filter for 2
+        assert len(index.bloom) > index.bloom.capacity
+        await index.refresh(session)
+
+        assert index.bloom.capacity == 4
+        assert all(
+            name in index.bloom for name in ("alice", "user0", "user1", "user2")
+        )
+
+    run_with_db(scenario)
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from registration_app.api_v1.auth import rate_limit
+from registration_app.api_v1.auth.rate_limit import InMemorySlidingWindowBackend
+
+WINDOW = 60.0
+LIMIT = 3
+
+
+class Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock(now=2 * WINDOW)
+    monkeypatch.setattr(rate_limit, "monotonic", clock)
+    return clock
+
+
+def hit(backend: InMemorySlidingWindowBackend, key: str = "user:alice") -> float | None:
+    return asyncio.run(backend.hit(key, LIMIT))
+
+
+def test_hits_up_to_the_limit_are_allowed(clock):
+    backend = InMemorySlidingWindowBackend(window=WINDOW, max_keys=10)
+
+    assert [hit(backend) for _ in range(LIMIT)] == [None] * LIMIT
+    # the first one over it waits for the end of the window
+    assert hit(backend) == pytest.approx(WINDOW)
+
+
+def test_previous_window_is_weighted_by_its_overlap(clock):
+    backend = InMemorySlidingWindowBackend(window=WINDOW, max_keys=10)
+    for _ in range(LIMIT):
+        hit(backend)
+
+    # half way through the next window: the 3 hits before count for 1.5
+    clock.now = 3 * WINDOW + WINDOW / 2
+    assert hit(backend) is None  # 1.5 + 0
+    assert hit(backend) is None  # 1.5 + 1
+    # 1.5 + 2 >= 3: allowed again once 3 * (1 - elapsed) + 2 < 3,
+    # i.e. at 2/3 of the window, 10 s from now
+    assert hit(backend) == pytest.approx(WINDOW * (2 / 3 - 1 / 2))
+
+    clock.now = 3 * WINDOW + WINDOW * 2 / 3 + 1
+    assert hit(backend) is None
+
+
+def test_windows_further_back_are_forgotten(clock):
+    backend = InMemorySlidingWindowBackend(window=WINDOW, max_keys=10)
+    for _ in range(LIMIT):
+        hit(backend)
+
+    clock.now += 2 * WINDOW
+    assert [hit(backend) for _ in range(LIMIT)] == [None] * LIMIT
+
+
+def test_least_recently_used_key_is_evicted(clock):
+    backend = InMemorySlidingWindowBackend(window=WINDOW, max_keys=2)
+    for _ in range(LIMIT):
+        hit(backend, "user:alice")
+    hit(backend, "user:bob")
+    # alice is used again (throttled), so bob is the oldest one
+    assert hit(backend, "user:alice") is not None
+    hit(backend, "user:carol")
+
+    assert list(backend._counters) == ["user:alice", "user:carol"]
+
+
+def test_throttle_login_sends_retry_after(clock, monkeypatch):
+    backend = InMemorySlidingWindowBackend(window=WINDOW, max_keys=10)
+    monkeypatch.setattr(rate_limit, "login_limiter_backend", backend)
+    monkeypatch.setattr(rate_limit.settings.login_throttle, "enabled", True)
+    monkeypatch.setattr(rate_limit.settings.login_throttle, "username_limit", LIMIT)
+    request = SimpleNamespace(client=SimpleNamespace(host="192.0.2.1"))
+
+    def login() -> None:
+        asyncio.run(rate_limit.throttle_login(request, username="alice"))
+
+    for _ in range(LIMIT):
+        login()
+
+    clock.now += WINDOW / 4
+    with pytest.raises(HTTPException) as exc_info:
+        login()
+    assert exc_info.value.status_code == 429
+    # 45 s left in the window
+    assert exc_info.value.headers["Retry-After"] == "45"
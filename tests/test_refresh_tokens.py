@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from registration_app.api_v1.auth import validation
+from registration_app.api_v1.auth.helpers import create_refresh_token
+from registration_app.api_v1.auth.revocation import revocation_store
+from registration_app.api_v1.auth.user_cache import user_cache
+from registration_app.api_v1.auth_crypto.utils import decode_jwt
+from registration_app.core.schemas.user import UserProfile
+
+USER_ID = 4343
+
+
+def make_user(credential_version: int) -> UserProfile:
+    return UserProfile(
+        id=USER_ID,
+        username="alice",
+        email="alice@example.com",
+        is_active=True,
+        credential_version=credential_version,
+    )
+
+
+@pytest.fixture
+def user_in_db(monkeypatch):
+    """The row `get_user_by_id` returns, to change between two calls."""
+    row = SimpleNamespace(
+        id=USER_ID,
+        username="alice",
+        email="alice@example.com",
+        is_active=True,
+        credential_version=0,
+    )
+
+    async def get_user_by_id(session, user_id):
+        return row
+
+    async def is_revoked(session, jti):
+        return False
+
+    monkeypatch.setattr(validation, "get_user_by_id", get_user_by_id)
+    monkeypatch.setattr(revocation_store, "is_revoked", is_revoked)
+    user_cache.clear()
+    yield row
+    user_cache.clear()
+
+
+def refresh(token: str) -> UserProfile:
+    return asyncio.run(
+        validation.get_current_auth_user_for_refresh(decode_jwt(token), session=None)
+    )
+
+
+def test_refresh_token_is_accepted_while_credentials_are_unchanged(user_in_db):
+    token = create_refresh_token(make_user(credential_version=0))
+
+    assert refresh(token).id == USER_ID
+
+
+def test_refresh_token_is_rejected_after_a_password_change(user_in_db):
+    token = create_refresh_token(make_user(credential_version=0))
+    # what `update_user_password` does: bump the version, forget the user
+    user_in_db.credential_version = 1
+    user_cache.clear()
+
+    with pytest.raises(HTTPException) as exc_info:
+        refresh(token)
+    assert exc_info.value.status_code == 401
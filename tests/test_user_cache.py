@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+from registration_app.api_v1.auth import validation
+from registration_app.api_v1.auth.user_cache import forget_user, user_cache
+
+USER_ID = 4242
+
+
+def user_row(is_active: bool) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=USER_ID,
+        username="alice",
+        email="alice@example.com",
+        is_active=is_active,
+        credential_version=0,
+    )
+
+
+def test_lookup_in_flight_during_forget_user_is_not_cached(monkeypatch):
+    """A row read before a change must not be cached once `forget_user` ran."""
+
+    async def scenario() -> None:
+        read = asyncio.Event()
+        release = asyncio.Event()
+
+        async def get_user_by_id(session, user_id):
+            # read before the deactivation, answered after it
+            read.set()
+            await release.wait()
+            return user_row(is_active=True)
+
+        monkeypatch.setattr(validation, "get_user_by_id", get_user_by_id)
+        user_cache.clear()
+
+        lookup = asyncio.create_task(
+            validation.get_user_by_token_sub({"sub": str(USER_ID)}, session=None)
+        )
+        await read.wait()
+        # what `deactivate_user_account` does once it committed
+        forget_user(USER_ID)
+        release.set()
+
+        # the request that started before the change gets the old row...
+        assert (await lookup).is_active
+        # ...but the later ones don't
+        assert user_cache.get(USER_ID) is None
+
+    asyncio.run(scenario())
+
+
+def test_lookup_after_forget_user_is_cached(monkeypatch):
+    async def scenario() -> None:
+        async def get_user_by_id(session, user_id):
+            return user_row(is_active=False)
+
+        monkeypatch.setattr(validation, "get_user_by_id", get_user_by_id)
+        user_cache.clear()
+        forget_user(USER_ID)
+
+        await validation.get_user_by_token_sub({"sub": str(USER_ID)}, session=None)
+        assert user_cache.get(USER_ID).is_active is False
+
+    asyncio.run(scenario())